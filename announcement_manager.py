@@ -4,9 +4,11 @@
 """
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 from database import get_session
 from models import Announcement, AnnouncementRecipient, User
@@ -19,6 +21,14 @@ load_dotenv("config.env")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
 
+# Кількість одночасних запитів до Telegram при розсилці оголошення
+# (помірна - щоб не впиратися в ліміт Telegram ~30 повідомлень/с)
+SEND_MAX_WORKERS = 8
+
+# Спільна HTTP-сесія для розсилки (повторне використання з'єднань між потоками)
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=SEND_MAX_WORKERS))
+
 
 class AnnouncementManager:
     """Клас для управління оголошеннями через БД"""
@@ -77,78 +87,27 @@ class AnnouncementManager:
                 
                 message_text = f"{priority_emoji}\n\n{content}\n\n👤 Автор: @{author_username}"
                 
-                # Відправляємо повідомлення кожному отримувачу
-                sent_count = 0
-                failed_count = 0
+                # Відправляємо повідомлення отримувачам паралельно (мережеві запити
+                # перекриваються), історію відправки зберігаємо в БД після розсилки
+                announcement_id = announcement.id
+                with ThreadPoolExecutor(max_workers=SEND_MAX_WORKERS) as pool:
+                    results = list(pool.map(
+                        lambda recipient_id: self._send_to_recipient(announcement_id, recipient_id, message_text),
+                        recipient_user_ids
+                    ))
                 
-                for recipient_id in recipient_user_ids:
-                    try:
-                        # Відправляємо через Telegram Bot API
-                        response = requests.post(
-                            f"{TELEGRAM_API_URL}/sendMessage",
-                            json={
-                                'chat_id': recipient_id,
-                                'text': message_text,
-                                'parse_mode': 'HTML'
-                            },
-                            timeout=10
-                        )
-                        
-                        if response.status_code == 200:
-                            status = 'sent'
-                            sent_count += 1
-                        else:
-                            # Спробуємо отримати дані про помилку
-                            try:
-                                error_data = response.json()
-                                error_code = error_data.get('error_code', 0)
-                                error_description = error_data.get('description', 'Unknown error')
-                            except (ValueError, KeyError):
-                                # Якщо не вдалося розпарсити JSON, використовуємо текст відповіді
-                                error_code = response.status_code
-                                error_description = response.text[:100] if response.text else 'Unknown error'
-                            
-                            # Визначаємо статус та обробляємо різні типи помилок
-                            if error_code == 403:
-                                status = 'blocked'  # Користувач заблокував бота
-                            elif error_code == 400:
-                                error_desc_lower = error_description.lower()
-                                if 'chat not found' in error_desc_lower or 'chat_id is empty' in error_desc_lower or 'bad request: chat not found' in error_desc_lower:
-                                    status = 'blocked'  # Чат не знайдено (користувач не запустив бота або видалив чат)
-                                else:
-                                    status = 'failed'
-                            else:
-                                status = 'failed'
-                            
-                            failed_count += 1
-                            
-                            # Логуємо тільки реальні помилки, не нормальні ситуації (заблокований/не знайдений чат)
-                            if status == 'failed':
-                                logger.log_warning(f"Помилка відправки оголошення {announcement.id} користувачу {recipient_id}: {error_description}")
-                            # Для заблокованих/не знайдених чатів не логуємо - це нормальна ситуація
-                        
-                        # Зберігаємо історію відправки
-                        recipient = AnnouncementRecipient(
-                            announcement_id=announcement.id,
-                            recipient_user_id=recipient_id,
-                            sent_at=datetime.now(),
-                            status=status
-                        )
-                        session.add(recipient)
-                        
-                    except requests.exceptions.RequestException as e:
-                        failed_count += 1
-                        status = 'failed'
-                        logger.log_error(f"Помилка відправки оголошення {announcement.id} користувачу {recipient_id}: {e}")
-                        
-                        # Зберігаємо історію навіть при помилці
-                        recipient = AnnouncementRecipient(
-                            announcement_id=announcement.id,
-                            recipient_user_id=recipient_id,
-                            sent_at=datetime.now(),
-                            status=status
-                        )
-                        session.add(recipient)
+                sent_count = sum(1 for _, status, _ in results if status == 'sent')
+                failed_count = len(results) - sent_count
+                
+                session.add_all([
+                    AnnouncementRecipient(
+                        announcement_id=announcement.id,
+                        recipient_user_id=recipient_id,
+                        sent_at=sent_at,
+                        status=status
+                    )
+                    for recipient_id, status, sent_at in results
+                ])
                 
                 # Оновлюємо кількість отримувачів
                 announcement.recipient_count = sent_count
@@ -166,6 +125,66 @@ class AnnouncementManager:
             logger.log_error(f"Помилка відправки оголошення: {e}")
             return {'sent': 0, 'failed': len(recipient_user_ids), 'announcement_id': None}
     
+    def _send_to_recipient(self, announcement_id: int, recipient_id: int, message_text: str) -> Tuple[int, str, datetime]:
+        """
+        Відправка оголошення одному отримувачу (виконується в потоці пулу, без доступу до БД)
+        
+        Args:
+            announcement_id: ID оголошення (для логування)
+            recipient_id: user_id отримувача
+            message_text: Текст повідомлення
+            
+        Returns:
+            Кортеж (recipient_id, status, sent_at), status: sent, failed, blocked
+        """
+        try:
+            # Відправляємо через Telegram Bot API
+            response = _http_session.post(
+                f"{TELEGRAM_API_URL}/sendMessage",
+                json={
+                    'chat_id': recipient_id,
+                    'text': message_text,
+                    'parse_mode': 'HTML'
+                },
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                return recipient_id, 'sent', datetime.now()
+            
+            # Спробуємо отримати дані про помилку
+            try:
+                error_data = response.json()
+                error_code = error_data.get('error_code', 0)
+                error_description = error_data.get('description', 'Unknown error')
+            except (ValueError, KeyError):
+                # Якщо не вдалося розпарсити JSON, використовуємо текст відповіді
+                error_code = response.status_code
+                error_description = response.text[:100] if response.text else 'Unknown error'
+            
+            # Визначаємо статус та обробляємо різні типи помилок
+            if error_code == 403:
+                status = 'blocked'  # Користувач заблокував бота
+            elif error_code == 400:
+                error_desc_lower = error_description.lower()
+                if 'chat not found' in error_desc_lower or 'chat_id is empty' in error_desc_lower or 'bad request: chat not found' in error_desc_lower:
+                    status = 'blocked'  # Чат не знайдено (користувач не запустив бота або видалив чат)
+                else:
+                    status = 'failed'
+            else:
+                status = 'failed'
+            
+            # Логуємо тільки реальні помилки, не нормальні ситуації (заблокований/не знайдений чат)
+            if status == 'failed':
+                logger.log_warning(f"Помилка відправки оголошення {announcement_id} користувачу {recipient_id}: {error_description}")
+            # Для заблокованих/не знайдених чатів не логуємо - це нормальна ситуація
+            
+            return recipient_id, status, datetime.now()
+        except requests.exceptions.RequestException as e:
+            logger.log_error(f"Помилка відправки оголошення {announcement_id} користувачу {recipient_id}: {e}")
+            # Зберігаємо історію навіть при помилці
+            return recipient_id, 'failed', datetime.now()
+    
     def get_announcement_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Отримання історії відправлених оголошень
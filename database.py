@@ -66,7 +66,17 @@ class DatabaseManager:
                 cursor.execute("PRAGMA busy_timeout=30000")
                 cursor.close()
         else:
-            self.engine = create_engine(database_url, echo=False)
+            # Пул з'єднань для серверних СУБД (PostgreSQL тощо): запит бере готове
+            # з'єднання з пулу замість нового TCP-підключення та автентифікації
+            self.engine = create_engine(
+                database_url,
+                pool_size=10,  # Розмір пулу з'єднань
+                max_overflow=20,  # Максимум додаткових з'єднань
+                pool_timeout=30,  # Очікування вільного з'єднання (секунд)
+                pool_pre_ping=True,  # Перевірка з'єднання перед використанням
+                pool_recycle=1800,  # Перестворення з'єднань кожні 30 хвилин
+                echo=False
+            )
         
         # Створюємо session factory
         self.SessionLocal = sessionmaker(
@@ -114,6 +124,12 @@ class DatabaseManager:
             self.migrate_add_group_id_to_schedule()
             self.migrate_add_poll_fields()
             self.migrate_active_sessions_table()  # Міграція таблиці активних сесій
+            self.migrate_add_log_indexes()
+            self.migrate_add_log_search_index()
+            self.migrate_user_foreign_keys()  # ON DELETE для зовнішніх ключів на users
+            self.migrate_add_active_session_index()
+            self.migrate_add_schedule_index()
+            self.migrate_backfill_daily_log_stats(created_tables)
             
             # Видаляємо загальні записи без teacher_user_id
             self.migrate_remove_orphaned_entries()
@@ -383,6 +399,218 @@ class DatabaseManager:
         except Exception as e:
             logger.log_error(f"Помилка міграції створення таблиці active_sessions: {e}")
     
+    def migrate_add_log_indexes(self):
+        """Міграція: створення складених індексів таблиці logs для існуючих БД"""
+        try:
+            from models import Log
+            for index in Log.__table__.indexes:
+                if index.name in ('ix_logs_cmd_ts', 'ix_logs_level_ts'):
+                    index.create(bind=self.engine, checkfirst=True)
+        except Exception as e:
+            logger.log_error(f"Помилка міграції створення індексів logs: {e}")
+    
+    def migrate_add_active_session_index(self):
+        """Міграція: складений індекс (is_active, last_activity) для існуючих БД"""
+        try:
+            from models import ActiveSession
+            for index in ActiveSession.__table__.indexes:
+                if index.name == 'ix_active_session_active_lastact':
+                    index.create(bind=self.engine, checkfirst=True)
+        except Exception as e:
+            logger.log_error(f"Помилка міграції створення індексу active_sessions: {e}")
+    
+    def migrate_add_schedule_index(self):
+        """Міграція: складений індекс (teacher_user_id, day_of_week, week_type) для існуючих БД"""
+        try:
+            from models import ScheduleEntry
+            for index in ScheduleEntry.__table__.indexes:
+                if index.name == 'ix_schedule_teacher_day_wt':
+                    index.create(bind=self.engine, checkfirst=True)
+        except Exception as e:
+            logger.log_error(f"Помилка міграції створення індексу schedule_entries: {e}")
+    
+    def migrate_backfill_daily_log_stats(self, created_tables: set):
+        """
+        Міграція: заповнення зведеної таблиці daily_log_stats з існуючих логів
+        
+        Args:
+            created_tables: Таблиці, створені під час поточної ініціалізації
+        """
+        # Заповнюємо тільки щойно створену таблицю в БД з уже наявними логами
+        if 'daily_log_stats' not in created_tables or 'logs' in created_tables:
+            return
+        try:
+            from sqlalchemy import func, insert, select
+            from models import DailyLogStats, Log
+            
+            day = func.date(Log.timestamp)
+            with self.engine.begin() as conn:
+                conn.execute(insert(DailyLogStats).from_select(
+                    ['date', 'level', 'count'],
+                    select(day, Log.level, func.count(Log.id)).where(
+                        Log.timestamp.isnot(None)
+                    ).group_by(day, Log.level)
+                ))
+            logger.log_info("Таблицю daily_log_stats заповнено з існуючих логів")
+        except Exception as e:
+            logger.log_error(f"Помилка міграції заповнення daily_log_stats: {e}")
+    
+    def migrate_add_log_search_index(self):
+        """Міграція: триграмний GIN індекс для пошуку по тексту логів (тільки PostgreSQL)"""
+        if self.engine.dialect.name != 'postgresql':
+            # SQLite не підтримує GIN/pg_trgm - пошук працює без індексу
+            return
+        try:
+            from sqlalchemy import text
+            with self.engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_logs_message_trgm "
+                    "ON logs USING gin (message gin_trgm_ops)"
+                ))
+        except Exception as e:
+            logger.log_error(f"Помилка міграції створення індексу пошуку logs: {e}")
+    
+    def migrate_user_foreign_keys(self):
+        """
+        Міграція: зовнішні ключі на users приводяться у відповідність до моделей
+        
+        Дані викладача (розклад, академічні періоди) видаляються каскадно, куратор
+        групи обнуляється, а таблиці статистики (опитування, відповіді, отримувачі
+        оголошень) більше не мають FK і не блокують видалення користувача.
+        """
+        try:
+            from sqlalchemy import inspect
+            inspector = inspect(self.engine)
+            existing_tables = set(inspector.get_table_names())
+            
+            tables_to_fix = []
+            for table in Base.metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+                
+                expected = {
+                    (fk.parent.name, (fk.ondelete or '').upper())
+                    for fk in table.foreign_keys
+                    if fk.column.table.name == 'users'
+                }
+                actual = {
+                    (fk['constrained_columns'][0], (fk['options'].get('ondelete') or '').upper())
+                    for fk in inspector.get_foreign_keys(table.name)
+                    if fk['referred_table'] == 'users'
+                }
+                if expected != actual:
+                    tables_to_fix.append(table)
+            
+            if not tables_to_fix:
+                return
+            
+            if self.engine.dialect.name == 'sqlite':
+                self._rebuild_sqlite_tables(tables_to_fix)
+            else:
+                self._recreate_user_foreign_keys(tables_to_fix)
+            
+            logger.log_info(
+                f"Оновлено зовнішні ключі на users: {', '.join(t.name for t in tables_to_fix)}"
+            )
+        except Exception as e:
+            logger.log_error(f"Помилка міграції зовнішніх ключів users: {e}")
+    
+    def _rebuild_sqlite_tables(self, tables):
+        """
+        Перебудова таблиць SQLite за схемою моделей (SQLite не підтримує ALTER CONSTRAINT)
+        
+        Args:
+            tables: Таблиці SQLAlchemy, які потрібно перебудувати
+        """
+        from sqlalchemy import inspect
+        from sqlalchemy.schema import CreateTable
+        
+        preparer = self.engine.dialect.identifier_preparer
+        
+        with self.engine.connect() as conn:
+            # Поза транзакцією: під час перебудови FK не перевіряються
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            try:
+                # pysqlite не відкриває транзакцію перед DDL сам - без явного BEGIN кожна
+                # команда комітиться одразу і rollback нічого не відкочує.
+                # IMMEDIATE одразу бере блокування на запис (бот і веб-адмінка стартують паралельно)
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                for table in tables:
+                    inspector = inspect(conn)
+                    table_name = preparer.format_table(table)
+                    new_table_name = preparer.quote(f"{table.name}__new")
+                    
+                    # Залишок невдалої перебудови (на випадок, якщо БД змінили поза транзакцією)
+                    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {new_table_name}")
+                    
+                    # Старі індекси видаляємо - після перебудови вони створюються з моделі
+                    for index in inspector.get_indexes(table.name):
+                        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {preparer.quote(index['name'])}")
+                    
+                    create_sql = str(CreateTable(table).compile(dialect=self.engine.dialect))
+                    conn.exec_driver_sql(
+                        create_sql.replace(f"CREATE TABLE {table_name} ", f"CREATE TABLE {new_table_name} ", 1)
+                    )
+                    
+                    columns = ', '.join(
+                        preparer.quote(col['name'])
+                        for col in inspector.get_columns(table.name)
+                        if col['name'] in table.c
+                    )
+                    conn.exec_driver_sql(
+                        f"INSERT INTO {new_table_name} ({columns}) SELECT {columns} FROM {table_name}"
+                    )
+                    conn.exec_driver_sql(f"DROP TABLE {table_name}")
+                    conn.exec_driver_sql(f"ALTER TABLE {new_table_name} RENAME TO {table_name}")
+                    
+                    for index in table.indexes:
+                        index.create(bind=conn)
+                
+                # Перевірка цілісності до коміту: при порушеннях відкочуємо всю перебудову
+                violations = [
+                    violation
+                    for table in tables
+                    for violation in conn.exec_driver_sql(
+                        f"PRAGMA foreign_key_check({preparer.format_table(table)})"
+                    ).fetchall()
+                ]
+                if violations:
+                    raise RuntimeError(f"Після перебудови таблиць знайдено порушень FK: {len(violations)}")
+                
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+    
+    def _recreate_user_foreign_keys(self, tables):
+        """
+        Перестворення зовнішніх ключів на users (PostgreSQL та інші СУБД з ALTER CONSTRAINT)
+        
+        Args:
+            tables: Таблиці SQLAlchemy, FK яких потрібно оновити
+        """
+        from sqlalchemy import inspect
+        from sqlalchemy.schema import AddConstraint
+        
+        preparer = self.engine.dialect.identifier_preparer
+        
+        with self.engine.begin() as conn:
+            inspector = inspect(conn)
+            for table in tables:
+                table_name = preparer.format_table(table)
+                for fk in inspector.get_foreign_keys(table.name):
+                    if fk['referred_table'] == 'users' and fk.get('name'):
+                        conn.exec_driver_sql(
+                            f"ALTER TABLE {table_name} DROP CONSTRAINT {preparer.quote(fk['name'])}"
+                        )
+                
+                for constraint in table.foreign_key_constraints:
+                    if constraint.referred_table.name == 'users':
+                        conn.execute(AddConstraint(constraint))
+    
     def drop_all_tables(self):
         """Видалення всіх таблиць (використовувати обережно!)"""
         try:
@@ -2,11 +2,22 @@
 Модуль логування для TeachHub
 Підтримує запис логів у файл та SQLite базу даних
 """
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Optional
 
+# Асинхронний запис логів у БД: записи накопичуються в черзі та
+# пишуться фоновим потоком пакетами, поза обробкою запиту
+DB_QUEUE_MAXSIZE = 10000
+DB_BATCH_SIZE = 100
+DB_FLUSH_INTERVAL = 0.1  # секунд
+
 
 class BotLogger:
     """Клас для логування дій бота (файл + БД)"""
@@ -40,10 +51,16 @@ class BotLogger:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
+        
+        # Черга записів для БД та фоновий потік, що її обробляє
+        self._db_queue = queue.Queue(maxsize=DB_QUEUE_MAXSIZE)
+        self._db_writer: Optional[threading.Thread] = None
+        self._db_writer_lock = threading.Lock()
+        atexit.register(self.flush)
     
     def _save_to_db(self, level: str, message: str, user_id: Optional[int] = None, command: Optional[str] = None):
         """
-        Збереження логу в БД
+        Збереження логу в БД (асинхронно, через чергу)
         
         Args:
             level: Рівень логу (INFO, WARNING, ERROR, SECURITY)
@@ -54,6 +71,66 @@ class BotLogger:
         if not self.use_db:
             return
         
+        # Не логуємо помилки самого запису в БД у БД (щоб уникнути рекурсії)
+        if threading.current_thread() is self._db_writer:
+            return
+        
+        try:
+            self._db_queue.put_nowait({
+                'timestamp': datetime.now(),
+                'level': level,
+                'message': message,
+                'user_id': user_id,
+                'command': command
+            })
+        except queue.Full:
+            # Черга переповнена - запис залишається тільки у файлі та консолі
+            return
+        
+        self._ensure_db_writer()
+    
+    def _ensure_db_writer(self) -> None:
+        """Запуск фонового потоку запису логів у БД (якщо ще не запущений)"""
+        if self._db_writer is not None and self._db_writer.is_alive():
+            return
+        
+        with self._db_writer_lock:
+            if self._db_writer is None or not self._db_writer.is_alive():
+                self._db_writer = threading.Thread(
+                    target=self._db_writer_loop,
+                    name='log-db-writer',
+                    daemon=True
+                )
+                self._db_writer.start()
+    
+    def _db_writer_loop(self) -> None:
+        """Фоновий цикл: збирає записи з черги пакетами та пише їх у БД"""
+        while True:
+            batch = [self._db_queue.get()]
+            deadline = time.monotonic() + DB_FLUSH_INTERVAL
+            
+            while len(batch) < DB_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._db_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._db_queue.task_done()
+    
+    def _write_batch(self, batch: list) -> None:
+        """
+        Запис пакета логів у БД одним INSERT
+        
+        Args:
+            batch: Список словників з полями Log
+        """
         try:
             # Імпортуємо тут щоб уникнути circular imports
             from database import get_session, get_db_manager
@@ -64,19 +141,69 @@ class BotLogger:
                 return  # БД ще не готова - пропускаємо
             
             with get_session() as session:
-                log = Log(
-                    timestamp=datetime.now(),
-                    level=level,
-                    message=message,
-                    user_id=user_id,
-                    command=command
-                )
-                session.add(log)
+                session.bulk_insert_mappings(Log, batch)
+                try:
+                    # Окремий savepoint: збій зведеної статистики не відкочує самі логи
+                    with session.begin_nested():
+                        self._update_daily_stats(session, batch)
+                except Exception as e:
+                    self.logger.error(f"Помилка оновлення daily_log_stats: {e}")
                 session.commit()
         except Exception as e:
             # Не логуємо помилку БД у БД (щоб уникнути рекурсії)
             # Тільки в консоль та файл
-            pass
+            self.logger.error(f"Помилка запису логів у БД: {e}")
+    
+    def _update_daily_stats(self, session, batch: list) -> None:
+        """
+        Інкремент зведених лічильників daily_log_stats для пакета логів (у savepoint транзакції запису)
+        
+        Args:
+            session: Сесія БД
+            batch: Список словників з полями Log
+        """
+        from sqlalchemy import update
+        from models import DailyLogStats
+        
+        counts = Counter((entry['timestamp'].date(), entry['level']) for entry in batch)
+        rows = [{'date': day, 'level': level, 'count': count} for (day, level), count in counts.items()]
+        
+        dialect = session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(DailyLogStats)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailyLogStats.date, DailyLogStats.level],
+                set_={'count': DailyLogStats.count + stmt.excluded['count']}
+            )
+            session.execute(stmt, rows)
+        else:
+            # Інші БД: UPDATE, а якщо рядка ще немає - INSERT
+            for row in rows:
+                updated = session.execute(
+                    update(DailyLogStats).where(
+                        DailyLogStats.date == row['date'],
+                        DailyLogStats.level == row['level']
+                    ).values(count=DailyLogStats.count + row['count'])
+                ).rowcount
+                if not updated:
+                    session.add(DailyLogStats(**row))
+    
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Очікування запису в БД усіх логів з черги
+        
+        Args:
+            timeout: Максимальний час очікування в секундах
+        """
+        deadline = time.monotonic() + timeout
+        while self._db_queue.unfinished_tasks and time.monotonic() < deadline:
+            if self._db_writer is None or not self._db_writer.is_alive():
+                break
+            time.sleep(0.01)
     
     def log_access_request(self, user_id: int, username: str) -> None:
         """Логування запиту на доступ"""
@@ -2,8 +2,9 @@
 SQLAlchemy моделі для TeachHub
 Містить всі таблиці БД для зберігання даних бота
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Text, ForeignKey, Index, cast, func, literal
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -25,6 +26,21 @@ class User(Base):
     can_edit_schedule = Column(Boolean, default=True)  # Чи може користувач редагувати розклад
     can_edit_academic = Column(Boolean, default=True)  # Чи може користувач редагувати академічні періоди
     
+    @hybrid_property
+    def display_name(self) -> str:
+        """Ім'я для відображення: ПІБ, username або ID"""
+        return self.full_name or self.username or f"ID: {self.user_id}"
+    
+    @display_name.inplace.expression
+    @classmethod
+    def _display_name_expression(cls):
+        # Те саме в SQL (порожні рядки, як і в Python, пропускаються)
+        return func.coalesce(
+            func.nullif(cls.full_name, ''),
+            func.nullif(cls.username, ''),
+            literal('ID: ') + cast(cls.user_id, String)
+        )
+    
     def __repr__(self):
         return f"<User(user_id={self.user_id}, username='{self.username}', role='{self.role}', full_name='{self.full_name}')>"
 
@@ -52,7 +68,7 @@ class ScheduleEntry(Base):
     subject = Column(String(200), nullable=False)
     lesson_type = Column(String(50), nullable=False)  # лекція, практика, лабораторна
     teacher = Column(String(200))  # Залишаємо для сумісності, але використовуємо teacher_user_id
-    teacher_user_id = Column(Integer, ForeignKey('users.user_id'), nullable=True, index=True)  # ID викладача
+    teacher_user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=True, index=True)  # ID викладача
     teacher_phone = Column(String(50))
     classroom = Column(String(50))
     conference_link = Column(String(500))
@@ -60,6 +76,11 @@ class ScheduleEntry(Base):
     week_type = Column(String(20), nullable=False, index=True)  # numerator, denominator
     group_id = Column(Integer, ForeignKey('groups.id'), nullable=True, index=True)  # ID групи
     
+    __table_args__ = (
+        # Розклад/навантаження викладача: фільтр по викладачу + день та/або тип тижня
+        Index('ix_schedule_teacher_day_wt', teacher_user_id, day_of_week, week_type),
+    )
+    
     def __repr__(self):
         return f"<ScheduleEntry(day={self.day_of_week}, subject='{self.subject}', week={self.week_type}, teacher_user_id={self.teacher_user_id})>"
 
@@ -91,7 +112,7 @@ class AcademicPeriod(Base):
     weeks = Column(Integer, nullable=False)
     color = Column(String(10), default='🟦')  # emoji для візуалізації
     description = Column(Text)
-    teacher_user_id = Column(Integer, ForeignKey('users.user_id'), nullable=True, index=True)  # ID викладача
+    teacher_user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=True, index=True)  # ID викладача
     
     def __repr__(self):
         return f"<AcademicPeriod(name='{self.name}', start='{self.start_date}', teacher_user_id={self.teacher_user_id})>"
@@ -111,6 +132,9 @@ class Announcement(Base):
     sent_at = Column(DateTime)  # Час відправки оголошення
     recipient_count = Column(Integer, default=0)  # Кількість отримувачів
     
+    # Relationship до отримувачів (тільки для читання - історія відправки)
+    recipients = relationship('AnnouncementRecipient', viewonly=True)
+    
     def __repr__(self):
         return f"<Announcement(id={self.id}, priority='{self.priority}', sent_at='{self.sent_at}', recipients={self.recipient_count})>"
 
@@ -121,10 +145,18 @@ class AnnouncementRecipient(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     announcement_id = Column(Integer, ForeignKey('announcements.id'), nullable=False, index=True)
-    recipient_user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
+    # Без FK на users - історія відправки зберігається для статистики після видалення користувача
+    recipient_user_id = Column(Integer, nullable=False, index=True)
     sent_at = Column(DateTime, default=datetime.now, index=True)
     status = Column(String(20), default='sent')  # sent, failed, blocked
     
+    # Relationship до User (без FK - користувач може бути вже видалений)
+    user = relationship(
+        'User',
+        primaryjoin='foreign(AnnouncementRecipient.recipient_user_id) == User.user_id',
+        viewonly=True
+    )
+    
     def __repr__(self):
         return f"<AnnouncementRecipient(announcement_id={self.announcement_id}, recipient_user_id={self.recipient_user_id}, status='{self.status}')>"
 
@@ -167,10 +199,29 @@ class Log(Base):
     user_id = Column(Integer, index=True)
     command = Column(String(100))
     
+    # Складені індекси для фільтрів сторінки логів (команда/рівень + сортування за часом)
+    __table_args__ = (
+        Index('ix_logs_cmd_ts', command, timestamp.desc(),
+              sqlite_where=command.isnot(None), postgresql_where=command.isnot(None)),
+        Index('ix_logs_level_ts', level, timestamp.desc()),
+    )
+    
     def __repr__(self):
         return f"<Log(level='{self.level}', timestamp='{self.timestamp}')>"
 
 
+class DailyLogStats(Base):
+    """Зведена кількість логів по днях та рівнях (оновлюється логером при записі в logs)"""
+    __tablename__ = 'daily_log_stats'
+    
+    date = Column(Date, primary_key=True)
+    level = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<DailyLogStats(date={self.date}, level={self.level}, count={self.count})>"
+
+
 class BotConfig(Base):
     """Конфігурація бота (key-value пари)"""
     __tablename__ = 'bot_config'
@@ -193,7 +244,7 @@ class Group(Base):
     name = Column(String(200), nullable=False, unique=True, index=True)  # Назва групи
     headman_name = Column(String(200))  # ПІБ старости групи
     headman_phone = Column(String(50))  # Телефон старости
-    curator_user_id = Column(Integer, ForeignKey('users.user_id'), nullable=True, index=True)  # ID куратора (викладача)
+    curator_user_id = Column(Integer, ForeignKey('users.user_id', ondelete='SET NULL'), nullable=True, index=True)  # ID куратора (викладача)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
@@ -207,7 +258,8 @@ class Poll(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     question = Column(Text, nullable=False)  # Питання опитування
-    author_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)  # ID автора (викладача)
+    # Без FK на users - закриті опитування зберігаються для статистики після видалення автора
+    author_id = Column(Integer, nullable=False, index=True)  # ID автора (викладача)
     author_username = Column(String(100))  # Username автора
     created_at = Column(DateTime, default=datetime.now, index=True)
     closed_at = Column(DateTime, nullable=True, index=True)  # Час закриття опитування
@@ -243,7 +295,8 @@ class PollResponse(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     poll_id = Column(Integer, ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
     option_id = Column(Integer, ForeignKey('poll_options.id', ondelete='CASCADE'), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
+    # Без FK на users - відповіді зберігаються для статистики після видалення користувача
+    user_id = Column(Integer, nullable=False, index=True)
     responded_at = Column(DateTime, default=datetime.now, index=True)
     
     # Унікальний індекс: один користувач може відповісти на опитування тільки один раз
@@ -271,6 +324,11 @@ class ActiveSession(Base):
     # Relationship до User
     user = relationship('User', backref='active_sessions')
     
+    __table_args__ = (
+        # Список активних сесій: фільтр по is_active + сортування last_activity DESC
+        Index('ix_active_session_active_lastact', is_active, last_activity.desc()),
+    )
+    
     def __repr__(self):
         return f"<ActiveSession(user_id={self.user_id}, session_id='{self.session_id[:20]}...', ip='{self.ip_address}', is_active={self.is_active})>"
 
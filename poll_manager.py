@@ -8,6 +8,7 @@ import requests
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
+from sqlalchemy import func
 
 from database import get_session
 from models import Poll, PollOption, PollResponse, User
@@ -173,21 +174,35 @@ class PollManager:
                     Poll.is_closed == False
                 ).order_by(Poll.created_at.desc()).all()
                 
+                # Автори, кількість відповідей та варіанти - по одному IN-запиту на всі опитування
+                poll_ids = [poll.id for poll in polls]
+                author_ids = {poll.author_id for poll in polls}
+                
+                authors = {
+                    user_id: full_name
+                    for user_id, full_name in session.query(User.user_id, User.full_name).filter(
+                        User.user_id.in_(author_ids)
+                    )
+                } if author_ids else {}
+                
+                response_counts = dict(
+                    session.query(PollResponse.poll_id, func.count(PollResponse.id)).filter(
+                        PollResponse.poll_id.in_(poll_ids)
+                    ).group_by(PollResponse.poll_id)
+                ) if poll_ids else {}
+                
+                options_by_poll = {poll_id: [] for poll_id in poll_ids}
+                if poll_ids:
+                    for opt in session.query(PollOption).filter(
+                        PollOption.poll_id.in_(poll_ids)
+                    ).order_by(PollOption.poll_id, PollOption.option_order):
+                        options_by_poll[opt.poll_id].append(
+                            {'id': opt.id, 'text': opt.option_text, 'order': opt.option_order}
+                        )
+                
                 result = []
                 for poll in polls:
-                    # Отримуємо автора
-                    author = session.query(User).filter(User.user_id == poll.author_id).first()
-                    author_name = author.full_name if author and author.full_name else poll.author_username or f"ID: {poll.author_id}"
-                    
-                    # Отримуємо кількість відповідей
-                    response_count = session.query(PollResponse).filter(
-                        PollResponse.poll_id == poll.id
-                    ).count()
-                    
-                    # Отримуємо варіанти відповіді
-                    options = session.query(PollOption).filter(
-                        PollOption.poll_id == poll.id
-                    ).order_by(PollOption.option_order).all()
+                    author_name = authors.get(poll.author_id) or poll.author_username or f"ID: {poll.author_id}"
                     
                     result.append({
                         'id': poll.id,
@@ -196,10 +211,10 @@ class PollManager:
                         'author_name': author_name,
                         'created_at': poll.created_at,
                         'expires_at': poll.expires_at,
-                        'response_count': response_count,
+                        'response_count': response_counts.get(poll.id, 0),
                         'sent_to_users': poll.sent_to_users,
                         'is_anonymous': poll.is_anonymous,
-                        'options': [{'id': opt.id, 'text': opt.option_text, 'order': opt.option_order} for opt in options]
+                        'options': options_by_poll[poll.id]
                     })
                 
                 return result
@@ -228,18 +243,14 @@ class PollManager:
                     PollOption.poll_id == poll_id
                 ).order_by(PollOption.option_order).all()
                 
-                # Отримуємо відповіді
-                responses = session.query(PollResponse).filter(
-                    PollResponse.poll_id == poll_id
-                ).all()
-                
-                # Підраховуємо голоси по кожному варіанту
-                option_votes = {opt.id: 0 for opt in options}
-                total_votes = len(responses)
-                
-                for response in responses:
-                    if response.option_id in option_votes:
-                        option_votes[response.option_id] += 1
+                # Підраховуємо голоси по кожному варіанту (GROUP BY в БД замість завантаження відповідей)
+                vote_counts = dict(
+                    session.query(PollResponse.option_id, func.count(PollResponse.id)).filter(
+                        PollResponse.poll_id == poll_id
+                    ).group_by(PollResponse.option_id).all()
+                )
+                option_votes = {opt.id: vote_counts.get(opt.id, 0) for opt in options}
+                total_votes = sum(vote_counts.values())
                 
                 # Формуємо результати
                 results = []
@@ -265,6 +276,7 @@ class PollManager:
                     'created_at': poll.created_at,
                     'closed_at': poll.closed_at,
                     'is_closed': poll.is_closed,
+                    'is_anonymous': poll.is_anonymous,
                     'total_votes': total_votes,
                     'results': results
                 }
@@ -9,6 +9,9 @@ from database import get_session
 from models import ScheduleEntry, ScheduleMetadata, User
 from logger import logger
 
+# Фіксована дата для арифметики з часом доби (важлива лише різниця, не сама дата)
+_EPOCH_DATE = date(2000, 1, 1)
+
 
 class ScheduleHandler:
     """Клас для роботи з розкладом занять через БД"""
@@ -248,8 +251,8 @@ class ScheduleHandler:
         if not (start_time <= current_time <= end_time):
             return None
         
-        current_datetime = datetime.combine(datetime.today(), current_time)
-        end_datetime = datetime.combine(datetime.today(), end_time)
+        current_datetime = datetime.combine(_EPOCH_DATE, current_time)
+        end_datetime = datetime.combine(_EPOCH_DATE, end_time)
         
         time_remaining = end_datetime - current_datetime
         total_minutes = int(time_remaining.total_seconds() / 60)
@@ -264,7 +267,7 @@ class ScheduleHandler:
         else:
             time_str = f"{total_minutes} хв"
         
-        total_duration = int((end_datetime - datetime.combine(datetime.today(), start_time)).total_seconds() / 60)
+        total_duration = int((end_datetime - datetime.combine(_EPOCH_DATE, start_time)).total_seconds() / 60)
         progress = int((total_duration - total_minutes) / total_duration * 20)
         progress = max(0, min(20, progress))
         
@@ -2,14 +2,25 @@
 Flask веб-інтерфейс для управління TeachHub
 Адмін панель для управління викладачами, розкладом, оголошеннями тощо
 """
+import asyncio
+import hashlib
 import os
+import re
 import sys
+import threading
+import time
 import uuid
 import requests
-from datetime import datetime, timedelta
-from typing import Dict, Any
-from functools import wraps
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session as flask_session
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, datetime, time as dt_time, timedelta
+from itertools import groupby
+from types import SimpleNamespace
+from typing import Dict, Any, Optional
+from functools import wraps, lru_cache
+from flask import Flask, Response, render_template, stream_template, get_flashed_messages, request, redirect, url_for, flash, jsonify, after_this_request, g, session as flask_session
 from flask_wtf import CSRFProtect
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_limiter import Limiter
@@ -17,6 +28,8 @@ from flask_limiter.util import get_remote_address
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
+from sqlalchemy import and_, case, event, func, or_, select, update, delete as sa_delete
+from sqlalchemy.orm import Session as OrmSession, object_session, selectinload
 
 # Додаємо батьківську директорію в Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -25,11 +38,13 @@ from database import init_database, get_session
 from models import (
     User, PendingRequest, ScheduleEntry, ScheduleMetadata,
     AcademicPeriod, Announcement, AnnouncementRecipient,
-    NotificationHistory, NotificationSettings, Log, BotConfig, Group,
+    NotificationHistory, NotificationSettings, Log, DailyLogStats, BotConfig, Group,
     Poll, PollOption, PollResponse, ActiveSession
 )
 from air_alert import get_air_alert_manager
+from announcement_manager import get_announcement_manager
 from poll_manager import get_poll_manager
+from schedule_handler import get_schedule_handler, ScheduleHandler
 from logger import logger
 
 # Завантажуємо змінні середовища
@@ -40,6 +55,34 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}" if TELEGRAM_BOT_TOKEN else None
 DEVELOPER_TELEGRAM_ID = os.getenv("DEVELOPER_TELEGRAM_ID")
 
+# Спільна HTTP-сесія для Telegram API (повторне використання TCP/TLS з'єднань)
+_tg_session = requests.Session()
+_tg_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
+# Пул потоків для фонової відправки сповіщень (адмін не чекає відповіді Telegram)
+_notify_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='tg-notify')
+
+# Українські назви днів тижня та типів тижня
+DAY_NAMES_UK = {
+    'monday': 'Понеділок', 'tuesday': 'Вівторок', 'wednesday': 'Середа',
+    'thursday': 'Четвер', 'friday': "П'ятниця", 'saturday': 'Субота', 'sunday': 'Неділя'
+}
+WEEK_TYPE_NAMES_UK = {
+    'numerator': 'Чисельник',
+    'denominator': 'Знаменник'
+}
+DAYS_ORDER = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+# Порядковий номер дня для сортування розкладу на рівні SQL
+_DAY_ORDINAL = case(
+    {day: i for i, day in enumerate(DAYS_ORDER)},
+    value=ScheduleEntry.day_of_week,
+    else_=len(DAYS_ORDER)
+)
+
 # Перевірка режиму роботи
 FLASK_ENV = os.getenv('FLASK_ENV', 'development')
 FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true' if FLASK_ENV == 'development' else False
@@ -50,6 +93,8 @@ app.config['ENV'] = FLASK_ENV
 app.config['DEBUG'] = FLASK_DEBUG and FLASK_ENV == 'development'
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['WTF_CSRF_ENABLED'] = True
+# Точні лічильники збережених для статистики записів при видаленні користувача
+app.config['DELETE_USER_EXACT_STATS'] = os.getenv('DELETE_USER_EXACT_STATS', 'False').lower() == 'true'
 
 # Валідація SECRET_KEY для production
 if FLASK_ENV == 'production':
@@ -85,10 +130,15 @@ login_manager.login_message = 'Будь ласка, увійдіть для до
 login_manager.login_message_category = 'info'
 
 
+def _wants_json() -> bool:
+    """Чи очікує клієнт JSON-відповідь (fetch/AJAX запит)"""
+    return request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
 @login_manager.unauthorized_handler
 def unauthorized():
     """Обробка неавторизованих запитів (включаючи завершені сесії)"""
-    if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+    if _wants_json():
         return jsonify({'error': 'Unauthorized', 'redirect': url_for('login')}), 401
     flash('Вашу сесію було завершено. Будь ласка, увійдіть знову.', 'warning')
     return redirect(url_for('login'))
@@ -148,17 +198,19 @@ def set_security_headers(response):
 def inject_metadata():
     """Додає metadata до всіх шаблонів"""
     try:
-        with get_session() as session:
-            metadata = session.query(ScheduleMetadata).first()
-            if metadata:
-                # Витягуємо значення всередині сесії, щоб уникнути DetachedInstanceError
-                academic_year = metadata.academic_year
-                return dict(global_metadata={'academic_year': academic_year})
-            return dict(global_metadata=None)
+        # Дані футера однакові для всіх сторінок - беремо з кешу довідників, а не з БД на кожен рендер
+        return dict(global_metadata=_get_cached_lookup('global_metadata', _load_global_metadata))
     except Exception:
         return dict(global_metadata=None)
 
 
+def _load_global_metadata() -> Optional[Dict[str, Any]]:
+    """Метадані для футера всіх шаблонів (кеш 'global_metadata')"""
+    with get_session() as session:
+        metadata = session.query(ScheduleMetadata.academic_year).first()
+        return {'academic_year': metadata.academic_year} if metadata else None
+
+
 # Клас для Flask-Login
 class WebUser(UserMixin):
     """Обгортка для User моделі для Flask-Login"""
@@ -187,6 +239,10 @@ class WebUser(UserMixin):
     def full_name(self):
         return self._full_name or self._username or f"ID: {self._user_id}"
     
+    @property
+    def display_name(self):
+        return self.full_name
+    
     @property
     def can_edit_schedule(self):
         # Адміністратори завжди мають права
@@ -230,8 +286,10 @@ def admin_required(f):
 
 # Функції управління сесіями
 def get_remote_ip():
-    """Отримання IP адреси клієнта з урахуванням ProxyFix"""
-    return get_remote_address()
+    """Отримання IP адреси клієнта з урахуванням ProxyFix (один раз за запит, flask.g)"""
+    if 'remote_addr' not in g:
+        g.remote_addr = get_remote_address()
+    return g.remote_addr
 
 
 def track_session_login(user_id, session_id, ip_address, user_agent):
@@ -302,19 +360,31 @@ def update_session_activity(session_id):
         pass
 
 
-def cleanup_expired_sessions():
-    """Очищення застарілих сесій (неактивних більше 24 годин)"""
+def cleanup_expired_sessions(session=None):
+    """
+    Очищення застарілих сесій (неактивних більше 24 годин)
+    
+    Args:
+        session: Відкрита сесія БД (якщо не вказано - відкривається нова)
+    """
+    if session is None:
+        with get_session() as own_session:
+            cleanup_expired_sessions(own_session)
+        return
+    
     try:
-        with get_session() as session:
-            cutoff_time = datetime.now() - timedelta(hours=24)
-            expired_count = session.query(ActiveSession).filter(
+        cutoff_time = datetime.now() - timedelta(hours=24)
+        # Core UPDATE без синхронізації ORM-об'єктів сесії
+        expired_count = session.execute(
+            update(ActiveSession).where(
                 ActiveSession.is_active == True,
                 ActiveSession.last_activity < cutoff_time
-            ).update({'is_active': False})
-            
-            session.commit()
-            if expired_count > 0:
-                logger.log_info(f"Очищено {expired_count} застарілих сесій")
+            ).values(is_active=False).execution_options(synchronize_session=False)
+        ).rowcount
+        
+        session.commit()
+        if expired_count > 0:
+            logger.log_info(f"Очищено {expired_count} застарілих сесій")
     except Exception as e:
         logger.log_error(f"Помилка очищення застарілих сесій: {e}")
 
@@ -328,14 +398,16 @@ def login():
     
     # Отримуємо список користувачів з паролями для вибору
     with get_session() as session:
-        users_with_passwords = session.query(User).filter(
+        users_with_passwords = session.query(
+            User.user_id, User.role, User.display_name.label('display_name')
+        ).filter(
             User.password_hash.isnot(None)
         ).order_by(User.full_name, User.username).all()
         
         # Формуємо список для dropdown
         users_list = []
         for user in users_with_passwords:
-            display_name = user.full_name if user.full_name else (user.username or f"ID: {user.user_id}")
+            display_name = user.display_name
             if user.role == 'admin':
                 display_name += " (Адмін)"
             users_list.append({
@@ -377,7 +449,7 @@ def login():
                     return redirect(next_page) if next_page else redirect(url_for('dashboard'))
                 else:
                     # Логування невдалої спроби входу
-                    logger.log_warning(f"Невдала спроба входу для користувача {user_id} з IP {get_remote_address()}", user_id=user_id if 'user_id' in locals() else None)
+                    logger.log_warning(f"Невдала спроба входу для користувача {user_id} з IP {get_remote_ip()}", user_id=user_id if 'user_id' in locals() else None)
                     flash('Невірний пароль.', 'danger')
         except ValueError:
             flash('Помилка вибору користувача.', 'danger')
@@ -387,13 +459,29 @@ def login():
     return render_template('login.html', users=users_list)
 
 
+# Автоматичні запити браузера, на які відповідаємо одразу (без сесії та БД): шлях -> endpoint
+_FAST_PATHS = {'/favicon.ico': 'favicon'}
+
+
+def fast_path_before_request():
+    """Відповідь на службові запити браузера їх view-функцією до решти before_request хуків"""
+    endpoint = _FAST_PATHS.get(request.path)
+    if endpoint:
+        return app.view_functions[endpoint]()
+
+
+# Ставимо хук на початок списку, щоб він виконувався раніше за хуки розширень
+# (CSRF, rate limiting), зареєстровані під час їх ініціалізації
+app.before_request_funcs.setdefault(None, []).insert(0, fast_path_before_request)
+
+
 @app.before_request
 def update_session_before_request():
     """Оновлення активності сесії перед кожним запитом та перевірка на завершені сесії"""
-    # Пропускаємо статичні файли, health check та login/logout
+    # Пропускаємо статичні файли, PWA-ресурси, health check та login/logout
     if request.endpoint and (
         request.endpoint.startswith('static') or 
-        request.endpoint == 'health_check' or
+        request.endpoint in ('health_check', 'apple_touch_icon', 'manifest', 'service_worker') or
         request.endpoint == 'login' or
         request.path.startswith('/static')
     ):
@@ -473,6 +561,52 @@ def logout():
     return redirect(url_for('login'))
 
 
+def _get_current_week_type(session) -> str:
+    """
+    Поточний тип тижня (numerator/denominator), обчислюється один раз за запит (flask.g)
+    
+    Args:
+        session: Відкрита сесія БД (для визначення з метаданих, якщо handler не ініціалізований)
+    """
+    if 'current_week_type' in g:
+        return g.current_week_type
+    
+    schedule_handler = get_schedule_handler()
+    if schedule_handler:
+        current_week_type = schedule_handler.get_current_week_type()
+    else:
+        # Якщо handler не ініціалізований, визначаємо тип тижня безпосередньо з БД
+        # з підтримкою автоматичного визначення через numerator_start_date
+        metadata_for_week = session.query(ScheduleMetadata).first()
+        if metadata_for_week:
+            # Спочатку намагаємося автоматично визначити на основі дати
+            if metadata_for_week.numerator_start_date:
+                try:
+                    temp_handler = ScheduleHandler()
+                    auto_week = temp_handler._calculate_week_type_from_date(metadata_for_week.numerator_start_date)
+                    if auto_week:
+                        # Оновлюємо current_week в БД для синхронізації
+                        if metadata_for_week.current_week != auto_week:
+                            metadata_for_week.current_week = auto_week
+                            metadata_for_week.last_updated = datetime.now()
+                            session.commit()
+                        current_week_type = auto_week
+                    else:
+                        # Якщо автоматичне визначення недоступне, використовуємо збережене значення
+                        current_week_type = metadata_for_week.current_week if metadata_for_week.current_week in ["numerator", "denominator"] else 'numerator'
+                except Exception as e:
+                    logger.log_error(f"Помилка автоматичного визначення типу тижня: {e}")
+                    current_week_type = metadata_for_week.current_week if metadata_for_week.current_week in ["numerator", "denominator"] else 'numerator'
+            else:
+                # Якщо автоматичне визначення недоступне, використовуємо збережене значення
+                current_week_type = metadata_for_week.current_week if metadata_for_week.current_week in ["numerator", "denominator"] else 'numerator'
+        else:
+            current_week_type = 'numerator'
+    
+    g.current_week_type = current_week_type
+    return current_week_type
+
+
 @app.route('/')
 @login_required
 def dashboard():
@@ -520,39 +654,7 @@ def dashboard():
                 tomorrow_weekday = weekday_map[tomorrow.weekday()]
                 
                 # Визначаємо поточний тип тижня
-                from schedule_handler import get_schedule_handler
-                schedule_handler = get_schedule_handler()
-                if schedule_handler:
-                    current_week_type = schedule_handler.get_current_week_type()
-                else:
-                    # Якщо handler не ініціалізований, визначаємо тип тижня безпосередньо з БД
-                    # з підтримкою автоматичного визначення через numerator_start_date
-                    metadata_for_week = session.query(ScheduleMetadata).first()
-                    if metadata_for_week:
-                        # Спочатку намагаємося автоматично визначити на основі дати
-                        if metadata_for_week.numerator_start_date:
-                            try:
-                                from schedule_handler import ScheduleHandler
-                                temp_handler = ScheduleHandler()
-                                auto_week = temp_handler._calculate_week_type_from_date(metadata_for_week.numerator_start_date)
-                                if auto_week:
-                                    # Оновлюємо current_week в БД для синхронізації
-                                    if metadata_for_week.current_week != auto_week:
-                                        metadata_for_week.current_week = auto_week
-                                        metadata_for_week.last_updated = datetime.now()
-                                        session.commit()
-                                    current_week_type = auto_week
-                                else:
-                                    # Якщо автоматичне визначення недоступне, використовуємо збережене значення
-                                    current_week_type = metadata_for_week.current_week if metadata_for_week.current_week in ["numerator", "denominator"] else 'numerator'
-                            except Exception as e:
-                                logger.log_error(f"Помилка автоматичного визначення типу тижня: {e}")
-                                current_week_type = metadata_for_week.current_week if metadata_for_week.current_week in ["numerator", "denominator"] else 'numerator'
-                        else:
-                            # Якщо автоматичне визначення недоступне, використовуємо збережене значення
-                            current_week_type = metadata_for_week.current_week if metadata_for_week.current_week in ["numerator", "denominator"] else 'numerator'
-                    else:
-                        current_week_type = 'numerator'
+                current_week_type = _get_current_week_type(session)
                 
                 # Заняття на сьогодні (показуємо заняття для поточного типу тижня)
                 today_lessons = session.query(ScheduleEntry).filter(
@@ -698,90 +800,83 @@ def delete_user(user_id):
                 
                 username = user.username
                 
-                # Видаляємо пов'язані дані користувача
+                # Видаляємо пов'язані дані користувача Core-запитами (без ORM flush)
                 # Деякі дані залишаємо для статистики та аудиту
                 deleted_count = 0
-                kept_for_stats = 0
                 
                 # 1. Видаляємо запити на доступ (не потрібні для статистики)
-                pending_deleted = session.query(PendingRequest).filter(
+                pending_deleted = session.execute(sa_delete(PendingRequest).where(
                     PendingRequest.user_id == user_id
-                ).delete()
+                )).rowcount
                 deleted_count += pending_deleted
                 
-                # 2. Видаляємо заняття викладача (поточні дані, не статистика)
-                schedule_deleted = session.query(ScheduleEntry).filter(
-                    ScheduleEntry.teacher_user_id == user_id
-                ).delete()
-                deleted_count += schedule_deleted
-                
-                # 3. Видаляємо академічні періоди викладача (поточні дані)
-                periods_deleted = session.query(AcademicPeriod).filter(
-                    AcademicPeriod.teacher_user_id == user_id
-                ).delete()
-                deleted_count += periods_deleted
-                
-                # 4. ЗАЛИШАЄМО записи отримувачів оголошень для статистики відправки
-                # (скільки оголошень було відправлено, статистика доставки)
-                announcement_recipients_count = session.query(AnnouncementRecipient).filter(
-                    AnnouncementRecipient.recipient_user_id == user_id
-                ).count()
-                kept_for_stats += announcement_recipients_count
-                
-                # 5. Оновлюємо групи, де користувач був куратором (встановлюємо NULL)
-                groups_updated = session.query(Group).filter(
-                    Group.curator_user_id == user_id
-                ).update({Group.curator_user_id: None})
-                deleted_count += groups_updated
-                
-                # 6. ЗАЛИШАЄМО закриті опитування для статистики (активні видаляємо)
+                # Заняття та академічні періоди викладача видаляються каскадно (ON DELETE CASCADE),
+                # куратор у групах обнуляється (ON DELETE SET NULL) - це робить сама БД
+                # при видаленні користувача. Кількість рахуємо заздалегідь для повідомлення
+                cascaded_count = sum(session.execute(select(
+                    select(func.count()).select_from(ScheduleEntry).where(
+                        ScheduleEntry.teacher_user_id == user_id
+                    ).scalar_subquery(),
+                    select(func.count()).select_from(AcademicPeriod).where(
+                        AcademicPeriod.teacher_user_id == user_id
+                    ).scalar_subquery(),
+                    select(func.count()).select_from(Group).where(
+                        Group.curator_user_id == user_id
+                    ).scalar_subquery()
+                )).one())
+                deleted_count += cascaded_count
+                
+                # 2. ЗАЛИШАЄМО закриті опитування для статистики (активні видаляємо)
                 # Видаляємо тільки активні опитування, створені користувачем
-                active_polls_deleted = session.query(Poll).filter(
+                active_polls_deleted = session.execute(sa_delete(Poll).where(
                     Poll.author_id == user_id,
                     Poll.is_closed == False
-                ).delete()
+                )).rowcount
                 deleted_count += active_polls_deleted
                 
-                # Рахуємо закриті опитування, які залишаємо
-                closed_polls_count = session.query(Poll).filter(
-                    Poll.author_id == user_id,
-                    Poll.is_closed == True
-                ).count()
-                kept_for_stats += closed_polls_count
-                
-                # 7. ЗАЛИШАЄМО відповіді користувача на опитування для статистики
-                # (результати опитувань важливі для аналітики)
-                poll_responses_count = session.query(PollResponse).filter(
-                    PollResponse.user_id == user_id
-                ).count()
-                kept_for_stats += poll_responses_count
-                
-                # 8. ЗАЛИШАЄМО історію оповіщень для статистики
-                # (скільки оповіщень було відправлено користувачу)
-                notification_history_count = session.query(NotificationHistory).filter(
-                    NotificationHistory.user_id == user_id
-                ).count()
-                kept_for_stats += notification_history_count
-                
-                # 9. Видаляємо налаштування оповіщень (не статистика)
-                notification_settings_deleted = session.query(NotificationSettings).filter(
+                # 3. Видаляємо налаштування оповіщень (не статистика)
+                notification_settings_deleted = session.execute(sa_delete(NotificationSettings).where(
                     NotificationSettings.user_id == user_id
-                ).delete()
+                )).rowcount
                 deleted_count += notification_settings_deleted
                 
-                # 10. ЗАЛИШАЄМО логи користувача для аудиту та статистики
-                logs_count = session.query(Log).filter(Log.user_id == user_id).count()
-                kept_for_stats += logs_count
+                # ЗАЛИШАЄМО для статистики та аудиту: отримувачів оголошень, закриті опитування,
+                # відповіді на опитування, історію оповіщень та логи користувача.
+                # Точна кількість потрібна лише для повідомлення, тому рахуємо її одним
+                # запитом і тільки якщо увімкнено DELETE_USER_EXACT_STATS
+                if app.config['DELETE_USER_EXACT_STATS']:
+                    kept_for_stats = sum(session.execute(select(
+                        select(func.count()).select_from(AnnouncementRecipient).where(
+                            AnnouncementRecipient.recipient_user_id == user_id
+                        ).scalar_subquery(),
+                        select(func.count()).select_from(Poll).where(
+                            Poll.author_id == user_id, Poll.is_closed == True
+                        ).scalar_subquery(),
+                        select(func.count()).select_from(PollResponse).where(
+                            PollResponse.user_id == user_id
+                        ).scalar_subquery(),
+                        select(func.count()).select_from(NotificationHistory).where(
+                            NotificationHistory.user_id == user_id
+                        ).scalar_subquery(),
+                        select(func.count()).select_from(Log).where(
+                            Log.user_id == user_id
+                        ).scalar_subquery()
+                    )).one())
+                else:
+                    kept_for_stats = None
+                
+                # 4. Видаляємо самого користувача (разом з каскадними даними)
+                session.execute(sa_delete(User).where(User.user_id == user_id))
                 
-                # 11. Видаляємо самого користувача
-                session.delete(user)
+                # Усі зміни - в одній транзакції
                 session.commit()
                 
                 # Логування критичної дії
                 logger.log_warning(
                     f"КРИТИЧНА ДІЯ: Користувач {current_user.user_id} ({current_user.full_name}) "
                     f"видалив користувача {user_id} (@{username}). "
-                    f"Видалено записів: {deleted_count}, залишено для статистики: {kept_for_stats}",
+                    f"Видалено записів: {deleted_count}, залишено для статистики: "
+                    f"{kept_for_stats if kept_for_stats is not None else 'не підраховано'}",
                     user_id=current_user.user_id
                 )
                 
@@ -789,7 +884,9 @@ def delete_user(user_id):
                 message = f'Користувача @{username} видалено!'
                 if deleted_count > 0:
                     message += f' Видалено {deleted_count} записів.'
-                if kept_for_stats > 0:
+                if kept_for_stats is None:
+                    message += ' Записи для статистики та аудиту збережено.'
+                elif kept_for_stats > 0:
                     message += f' Збережено {kept_for_stats} записів для статистики та аудиту.'
                 
                 flash(message, 'success')
@@ -818,7 +915,7 @@ def send_telegram_message(user_id: int, message: str) -> bool:
         return False
     
     try:
-        response = requests.post(
+        response = _tg_session.post(
             f"{TELEGRAM_API_URL}/sendMessage",
             json={
                 'chat_id': user_id,
@@ -833,6 +930,22 @@ def send_telegram_message(user_id: int, message: str) -> bool:
         return False
 
 
+def send_telegram_messages(items) -> list:
+    """
+    Одночасна відправка кількох повідомлень через Telegram Bot API
+    
+    Повідомлення відправляються паралельно через _notify_pool, тому загальний час
+    визначається найповільнішим запитом, а не сумою всіх запитів.
+    
+    Args:
+        items: Пари (user_id, message)
+        
+    Returns:
+        Список Future з результатами send_telegram_message у порядку items
+    """
+    return [_notify_pool.submit(send_telegram_message, user_id, message) for user_id, message in items]
+
+
 class EntryData:
     """Простий об'єкт для зберігання даних заняття для формування повідомлень"""
     def __init__(self, day_of_week, time, subject, classroom, week_type=None):
@@ -855,20 +968,11 @@ def format_schedule_change_message(entry, change_type: str) -> str:
         Відформатований текст повідомлення
     """
     # Перетворення назв днів на українську
-    day_names = {
-        'monday': 'Понеділок', 'tuesday': 'Вівторок', 'wednesday': 'Середа',
-        'thursday': 'Четвер', 'friday': "П'ятниця", 'saturday': 'Субота', 'sunday': 'Неділя'
-    }
-    
-    day_name = day_names.get(entry.day_of_week, entry.day_of_week)
+    day_name = DAY_NAMES_UK.get(entry.day_of_week, entry.day_of_week)
     classroom_text = f"🏛️ {entry.classroom}\n" if entry.classroom else ""
     
     # Перетворення типу тижня на українську
-    week_type_names = {
-        'numerator': 'Чисельник',
-        'denominator': 'Знаменник'
-    }
-    week_type_text = week_type_names.get(entry.week_type, entry.week_type) if hasattr(entry, 'week_type') else ''
+    week_type_text = WEEK_TYPE_NAMES_UK.get(entry.week_type, entry.week_type) if hasattr(entry, 'week_type') else ''
     week_type_display = f"📚 {week_type_text}\n" if week_type_text else ""
     
     if change_type == 'added':
@@ -881,16 +985,45 @@ def format_schedule_change_message(entry, change_type: str) -> str:
         emoji = "🗑️"
         title = "Видалено заняття з вашого розкладу"
     
-    message = f"{emoji} <b>{title}</b>\n\n"
-    message += f"<b>{entry.subject}</b>\n"
-    message += f"📆 {day_name}\n"
-    message += f"🕐 {entry.time}\n"
-    if week_type_display:
-        message += week_type_display
-    if classroom_text:
-        message += classroom_text
+    # Порожні week_type_display / classroom_text нічого не додають до рядка
+    return ''.join((
+        f"{emoji} <b>{title}</b>\n\n",
+        f"<b>{entry.subject}</b>\n",
+        f"📆 {day_name}\n",
+        f"🕐 {entry.time}\n",
+        week_type_display,
+        classroom_text
+    ))
+
+
+# Максимальна кількість занять у повідомленні про копіювання (ліміт довжини Telegram)
+COPY_MESSAGE_MAX_ENTRIES = 30
+
+
+def format_schedule_copy_message(entries, from_name: str) -> str:
+    """
+    Формування одного повідомлення про скопійовані заняття
+    
+    Args:
+        entries: Скопійовані заняття (з полями day_of_week, time, subject, week_type)
+        from_name: Ім'я викладача, від якого скопійовано розклад
+        
+    Returns:
+        Відформатований текст повідомлення
+    """
+    parts = [
+        "📋 <b>До вашого розкладу скопійовано заняття</b>\n\n",
+        f"Від: {from_name}\n",
+        f"Кількість занять: {len(entries)}\n\n"
+    ]
+    for entry in entries[:COPY_MESSAGE_MAX_ENTRIES]:
+        day_name = DAY_NAMES_UK.get(entry.day_of_week, entry.day_of_week)
+        week_type_text = WEEK_TYPE_NAMES_UK.get(entry.week_type, entry.week_type)
+        parts.append(f"📆 {day_name}, 🕐 {entry.time} - <b>{entry.subject}</b> ({week_type_text})\n")
+    if len(entries) > COPY_MESSAGE_MAX_ENTRIES:
+        parts.append(f"... та ще {len(entries) - COPY_MESSAGE_MAX_ENTRIES}\n")
     
-    return message
+    return ''.join(parts)
 
 
 @app.route('/users/approve/<int:user_id>', methods=['POST'])
@@ -924,7 +1057,7 @@ def approve_request(user_id):
                 "Тепер ви маєте доступ до розкладу занять.\n\n"
                 "Використовуйте команду /start або /menu для початку роботи."
             )
-            send_telegram_message(user_id, approval_message)
+            _notify_pool.submit(send_telegram_message, user_id, approval_message)
             
             flash(f'Запит від @{username} схвалено! Користувач отримав повідомлення.', 'success')
     except Exception as e:
@@ -951,7 +1084,7 @@ def deny_request(user_id):
                     "На жаль, ваш запит на доступ до розкладу занять було відхилено адміністратором.\n\n"
                     "Якщо ви вважаєте, що це помилка, зверніться до адміністратора."
                 )
-                send_telegram_message(user_id, denial_message)
+                _notify_pool.submit(send_telegram_message, user_id, denial_message)
                 
                 flash(f'Запит від @{username} відхилено! Користувач отримав повідомлення.', 'success')
             else:
@@ -1012,6 +1145,78 @@ def set_user_password(user_id):
     return redirect(url_for('users'))
 
 
+# Кеш довідників (викладачі, групи) та даних сторінок налаштувань і оголошень
+# Скидається після коміту змін відповідних моделей; TTL покриває зміни з інших процесів (бот)
+_lookup_cache: Dict[str, tuple] = {}
+_LOOKUP_CACHE_TTL = 60  # секунд
+_LOOKUP_CACHE_KEYS = {
+    User: ('teachers',),
+    Group: ('groups',),
+    ScheduleMetadata: ('settings', 'global_metadata'),
+    BotConfig: ('settings',),
+    Announcement: ('announcements',)
+}
+
+
+def _mark_lookup_cache_dirty(session, model) -> None:
+    """
+    Позначка кешів моделі до скидання після коміту сесії
+    
+    Під час flush зміни ще не закомічені: якщо скинути кеш одразу, паралельний запит
+    може закешувати старі рядки на весь TTL
+    """
+    keys = _LOOKUP_CACHE_KEYS.get(model)
+    if session is not None and keys:
+        session.info.setdefault('lookup_cache_dirty', set()).update(keys)
+
+
+for _model in _LOOKUP_CACHE_KEYS:
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(
+            _model, _event_name,
+            lambda mapper, connection, target: _mark_lookup_cache_dirty(object_session(target), mapper.class_)
+        )
+
+
+@event.listens_for(OrmSession, 'do_orm_execute')
+def _mark_lookup_cache_dirty_on_bulk(orm_execute_state):
+    """Масові update/delete не викликають подій маппера - позначаємо кеш тут"""
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper:
+        _mark_lookup_cache_dirty(orm_execute_state.session, orm_execute_state.bind_mapper.class_)
+
+
+@event.listens_for(OrmSession, 'after_commit')
+def _invalidate_lookup_cache_after_commit(session):
+    """Скидання позначених кешів довідників після успішного коміту"""
+    for key in session.info.pop('lookup_cache_dirty', ()):
+        _lookup_cache.pop(key, None)
+
+
+@event.listens_for(OrmSession, 'after_transaction_end')
+def _discard_lookup_cache_marks(session, transaction):
+    """Після відкату зовнішньої транзакції позначки більше не актуальні"""
+    if transaction.parent is None:
+        session.info.pop('lookup_cache_dirty', None)
+
+
+def _load_teachers(session) -> list:
+    """Список викладачів для кешу 'teachers' (тільки колонки, потрібні шаблонам)"""
+    return session.query(
+        User.user_id, User.full_name, User.username, User.display_name.label('display_name')
+    ).all()
+
+
+def _get_cached_lookup(key: str, loader):
+    """Значення довідника з кешу або завантаження через loader()"""
+    cached = _lookup_cache.get(key)
+    if cached and (datetime.now() - cached[1]).total_seconds() < _LOOKUP_CACHE_TTL:
+        return cached[0]
+    
+    value = loader()
+    _lookup_cache[key] = (value, datetime.now())
+    return value
+
+
 @app.route('/schedule')
 @login_required
 def schedule():
@@ -1026,76 +1231,83 @@ def schedule():
                 teacher_filter = request.args.get('teacher_id', type=int)
             
             # Отримуємо викладачів для вибору (тільки для адмінів)
+            # Завантажуємо тільки колонки, які використовує шаблон (без ORM-об'єктів)
+            # Викладачі з розкладу довантажуються з тієї ж таблиці users, тому один
+            # запит по users вже містить усіх викладачів, на яких посилається розклад
             if current_user.is_admin:
-                teachers = session.query(User).all()
-                existing_teacher_ids = {t.user_id for t in teachers}
-                
-                teachers_in_schedule = session.query(ScheduleEntry.teacher_user_id).distinct().all()
-                teacher_ids_in_schedule = {t[0] for t in teachers_in_schedule if t[0] is not None}
-                
-                for teacher_id in teacher_ids_in_schedule:
-                    if teacher_id not in existing_teacher_ids:
-                        user = session.query(User).filter(User.user_id == teacher_id).first()
-                        if user:
-                            teachers.append(user)
+                teachers = _get_cached_lookup(
+                    'teachers',
+                    lambda: _load_teachers(session)
+                )
             else:
                 teachers = []
             
-            # Отримуємо заняття з фільтрацією
-            # Розклад показується тільки для конкретного викладача
-            entries = []
-            if teacher_filter:
-                query = session.query(ScheduleEntry).filter(ScheduleEntry.teacher_user_id == teacher_filter)
-                entries = query.order_by(ScheduleEntry.time).all()
             metadata = session.query(ScheduleMetadata).first()
             
-            # Групуємо по днях та типу тижня
-            schedule_data = {}
-            days_order = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            day_names = {
-                'monday': 'Понеділок', 'tuesday': 'Вівторок', 'wednesday': 'Середа',
-                'thursday': 'Четвер', 'friday': "П'ятниця", 'saturday': 'Субота', 'sunday': 'Неділя'
-            }
+            # Отримуємо список груп для вибору (потрібен і формі додавання заняття)
+            groups = _get_cached_lookup(
+                'groups',
+                lambda: session.query(Group.id, Group.name).order_by(Group.name).all()
+            )
             
-            for day in days_order:
-                schedule_data[day] = {
-                    'numerator': [],
-                    'denominator': []
-                }
+            # Розклад показується тільки для конкретного викладача - без вибору
+            # викладача заняття не завантажуємо і не групуємо
+            if not teacher_filter:
+                return render_template('schedule.html',
+                                     schedule={},
+                                     metadata=metadata,
+                                     days_order=DAYS_ORDER,
+                                     day_names=DAY_NAMES_UK,
+                                     teachers=teachers,
+                                     groups=groups,
+                                     selected_teacher_id=None)
+            
+            # Отримуємо заняття викладача
+            entries = session.query(ScheduleEntry).filter(
+                ScheduleEntry.teacher_user_id == teacher_filter
+            ).order_by(
+                _DAY_ORDINAL, ScheduleEntry.week_type, ScheduleEntry.time
+            ).with_entities(
+                ScheduleEntry.id, ScheduleEntry.day_of_week, ScheduleEntry.time,
+                ScheduleEntry.subject, ScheduleEntry.lesson_type, ScheduleEntry.teacher,
+                ScheduleEntry.teacher_user_id, ScheduleEntry.teacher_phone,
+                ScheduleEntry.classroom, ScheduleEntry.conference_link,
+                ScheduleEntry.exam_type, ScheduleEntry.week_type, ScheduleEntry.group_id
+            ).all()
             
-            # Отримуємо список груп для вибору
-            groups = session.query(Group).order_by(Group.name).all()
+            # Групуємо по днях та типу тижня
+            schedule_data = _empty_schedule(DAYS_ORDER)
             
             # Створюємо словник викладачів для швидкого доступу
             teachers_dict = {t.user_id: t for t in teachers}
             
             # Створюємо словник груп для швидкого доступу
-            groups_dict = {}
-            if groups:
-                groups_dict = {g.id: g for g in groups}
-            
-            for entry in entries:
-                if entry.day_of_week in schedule_data:
-                    # Додаємо інформацію про викладача до entry
-                    if entry.teacher_user_id and entry.teacher_user_id in teachers_dict:
-                        teacher = teachers_dict[entry.teacher_user_id]
-                        entry.teacher_display = teacher.full_name if teacher.full_name else entry.teacher
-                    else:
-                        entry.teacher_display = entry.teacher
-                    
-                    # Додаємо інформацію про групу до entry
-                    if entry.group_id and entry.group_id in groups_dict:
-                        entry.group_name = groups_dict[entry.group_id].name
-                    else:
-                        entry.group_name = None
-                    
-                    schedule_data[entry.day_of_week][entry.week_type].append(entry)
+            groups_dict = {g.id: g for g in groups}
+            
+            def _view_entry(row):
+                # Легкий об'єкт замість ORM-екземпляра, щоб додати поля для шаблону
+                entry = SimpleNamespace(**row._asdict())
+                
+                # Додаємо інформацію про викладача до entry
+                teacher = teachers_dict.get(entry.teacher_user_id) if entry.teacher_user_id else None
+                entry.teacher_display = teacher.full_name if teacher and teacher.full_name else entry.teacher
+                
+                # Додаємо інформацію про групу до entry
+                group = groups_dict.get(entry.group_id) if entry.group_id else None
+                entry.group_name = group.name if group else None
+                return entry
+            
+            # Заняття вже впорядковані SQL за (день, тип тижня, час), тому кожна група
+            # записується у schedule_data один раз
+            for (day, week_type), rows in groupby(entries, key=lambda e: (e.day_of_week, e.week_type)):
+                if day in schedule_data and week_type in schedule_data[day]:
+                    schedule_data[day][week_type] = [_view_entry(row) for row in rows]
             
             return render_template('schedule.html',
                                  schedule=schedule_data,
                                  metadata=metadata,
-                                 days_order=days_order,
-                                 day_names=day_names,
+                                 days_order=DAYS_ORDER,
+                                 day_names=DAY_NAMES_UK,
                                  teachers=teachers,
                                  groups=groups,
                                  selected_teacher_id=teacher_filter)
@@ -1153,7 +1365,7 @@ def add_schedule_entry():
                 if notify_user and teacher_user_id:
                     try:
                         message = format_schedule_change_message(entry, 'added')
-                        send_telegram_message(teacher_user_id, message)
+                        _notify_pool.submit(send_telegram_message, teacher_user_id, message)
                     except Exception as notify_error:
                         logger.log_error(f"Помилка відправки сповіщення про додавання заняття: {notify_error}")
             
@@ -1219,7 +1431,7 @@ def edit_schedule_entry(entry_id):
                     if notify_user and teacher_user_id:
                         try:
                             message = format_schedule_change_message(entry, 'edited')
-                            send_telegram_message(teacher_user_id, message)
+                            _notify_pool.submit(send_telegram_message, teacher_user_id, message)
                         except Exception as notify_error:
                             logger.log_error(f"Помилка відправки сповіщення про редагування заняття: {notify_error}")
                 
@@ -1270,7 +1482,7 @@ def delete_schedule_entry(entry_id):
                 if current_user.is_admin and teacher_user_id_for_notification:
                     try:
                         message = format_schedule_change_message(entry_data, 'deleted')
-                        send_telegram_message(teacher_user_id_for_notification, message)
+                        _notify_pool.submit(send_telegram_message, teacher_user_id_for_notification, message)
                     except Exception as notify_error:
                         logger.log_error(f"Помилка відправки сповіщення про видалення заняття: {notify_error}")
                 
@@ -1291,6 +1503,7 @@ def copy_schedule():
         from_teacher_id = request.form.get('from_teacher_id', type=int)
         to_teacher_id = request.form.get('to_teacher_id', type=int)
         replace_existing = request.form.get('replace_existing') == 'on'  # Чи замінювати існуючі записи
+        notify_user = request.form.get('notify_user') == '1'  # Чи сповіщати цільового викладача
         
         if not from_teacher_id or not to_teacher_id:
             flash('Виберіть вихідного та цільового викладача!', 'warning')
@@ -1310,11 +1523,19 @@ def copy_schedule():
                 return redirect(url_for('schedule'))
             
             # Отримуємо ПІБ цільового викладача
-            to_teacher_name = to_teacher.full_name if to_teacher.full_name else to_teacher.username or f"ID: {to_teacher_id}"
+            to_teacher_name = to_teacher.display_name
             
             # Отримуємо всі записи розкладу від вихідного викладача
+            # (тільки колонки, що копіюються - без ORM-об'єктів)
             source_entries = session.query(ScheduleEntry).filter(
                 ScheduleEntry.teacher_user_id == from_teacher_id
+            ).order_by(
+                _DAY_ORDINAL, ScheduleEntry.week_type, ScheduleEntry.time
+            ).with_entities(
+                ScheduleEntry.day_of_week, ScheduleEntry.time, ScheduleEntry.subject,
+                ScheduleEntry.lesson_type, ScheduleEntry.teacher_phone, ScheduleEntry.classroom,
+                ScheduleEntry.conference_link, ScheduleEntry.exam_type, ScheduleEntry.week_type,
+                ScheduleEntry.group_id  # Група залишається та сама
             ).all()
             
             if not source_entries:
@@ -1322,37 +1543,37 @@ def copy_schedule():
                 return redirect(url_for('schedule'))
             
             # Якщо replace_existing, видаляємо існуючі записи цільового викладача
+            # (одним DELETE ... WHERE замість завантаження та видалення кожного запису)
             if replace_existing:
-                existing_entries = session.query(ScheduleEntry).filter(
+                session.query(ScheduleEntry).filter(
                     ScheduleEntry.teacher_user_id == to_teacher_id
-                ).all()
-                for entry in existing_entries:
-                    session.delete(entry)
-            
-            # Копіюємо записи
-            copied_count = 0
-            for source_entry in source_entries:
-                new_entry = ScheduleEntry(
-                    day_of_week=source_entry.day_of_week,
-                    time=source_entry.time,
-                    subject=source_entry.subject,
-                    lesson_type=source_entry.lesson_type,
+                ).delete(synchronize_session=False)
+
+            # Копіюємо записи одним executemany замість session.add() для кожного запису
+            rows = [
+                dict(
+                    source_entry._asdict(),
                     teacher=to_teacher_name,  # Оновлюємо ПІБ викладача
-                    teacher_user_id=to_teacher_id,
-                    teacher_phone=source_entry.teacher_phone,
-                    classroom=source_entry.classroom,
-                    conference_link=source_entry.conference_link,
-                    exam_type=source_entry.exam_type,
-                    week_type=source_entry.week_type,
-                    group_id=source_entry.group_id  # Група залишається та сама
+                    teacher_user_id=to_teacher_id
                 )
-                session.add(new_entry)
-                copied_count += 1
+                for source_entry in source_entries
+            ]
+            session.bulk_insert_mappings(ScheduleEntry, rows)
+            copied_count = len(rows)
             
             session.commit()
             
-            from_name = from_teacher.full_name or from_teacher.username or f"ID: {from_teacher_id}"
-            to_name = to_teacher.full_name or to_teacher.username or f"ID: {to_teacher_id}"
+            from_name = from_teacher.display_name
+            to_name = to_teacher.display_name
+            
+            # Одне повідомлення на цільового викладача замість окремого на кожне заняття
+            if notify_user:
+                try:
+                    send_telegram_messages([
+                        (to_teacher_id, format_schedule_copy_message(source_entries, from_name))
+                    ])
+                except Exception as notify_error:
+                    logger.log_error(f"Помилка відправки сповіщення про копіювання розкладу: {notify_error}")
             flash(f'Розклад скопійовано від {from_name} до {to_name}! Скопійовано записів: {copied_count}', 'success')
     except Exception as e:
         flash(f'Помилка копіювання розкладу: {e}', 'danger')
@@ -1360,46 +1581,121 @@ def copy_schedule():
     return redirect(url_for('schedule'))
 
 
+# Кеш кількості логів для фільтрів (COUNT по великій таблиці не виконуємо на кожен перегляд)
+_logs_count_cache: Dict[tuple, tuple] = {}
+_LOGS_COUNT_CACHE_TTL = 60  # секунд
+_LOGS_COUNT_CACHE_MAX = 100
+
+
+def _get_logs_count(query, cache_key: tuple) -> int:
+    """Кількість логів для фільтра з кешуванням на _LOGS_COUNT_CACHE_TTL секунд"""
+    cached = _logs_count_cache.get(cache_key)
+    if cached and (datetime.now() - cached[1]).total_seconds() < _LOGS_COUNT_CACHE_TTL:
+        return cached[0]
+    
+    total = query.order_by(None).count()
+    if len(_logs_count_cache) >= _LOGS_COUNT_CACHE_MAX:
+        _logs_count_cache.clear()
+    _logs_count_cache[cache_key] = (total, datetime.now())
+    return total
+
+
+@lru_cache(maxsize=1)
+def _get_available_commands(time_bucket: int) -> list:
+    """
+    Список команд для фільтра логів
+    
+    Args:
+        time_bucket: Номер хвилини (time.time() // 60) - результат кешується в межах хвилини
+    """
+    with get_session() as session:
+        rows = session.query(Log.command).filter(
+            Log.command.isnot(None)
+        ).distinct().order_by(Log.command).all()
+        return [cmd[0] for cmd in rows]
+
+
+def _parse_logs_cursor(ts_str: str, id_str: str):
+    """Розбір курсора пагінації логів (timestamp в ISO форматі + id)"""
+    if not ts_str or not id_str:
+        return None
+    try:
+        return datetime.fromisoformat(ts_str), int(id_str)
+    except ValueError:
+        return None
+
+
 @app.route('/logs')
 @admin_required
 def logs():
-    """Перегляд логів"""
+    """Перегляд логів (keyset-пагінація по timestamp + id замість OFFSET)"""
     try:
         # Параметри фільтрації
         level = request.args.get('level', '')
         search = request.args.get('search', '')
         command = request.args.get('command', '')
-        page = int(request.args.get('page', 1))
+        after = _parse_logs_cursor(request.args.get('after_ts', ''), request.args.get('after_id', ''))
+        before = _parse_logs_cursor(request.args.get('before_ts', ''), request.args.get('before_id', ''))
         per_page = 100
         
         with get_session() as session:
-            query = session.query(Log).order_by(Log.timestamp.desc())
+            # Тільки колонки, які показує шаблон - рядки без ORM-об'єктів та identity map
+            query = session.query(
+                Log.id, Log.timestamp, Log.level, Log.message, Log.user_id, Log.command
+            )
             
             # Фільтри
             if level:
                 query = query.filter(Log.level == level)
             if search:
-                query = query.filter(Log.message.contains(search))
+                # ILIKE - на PostgreSQL використовує триграмний індекс ix_logs_message_trgm
+                query = query.filter(Log.message.icontains(search, autoescape=True))
             if command:
                 query = query.filter(Log.command == command)
             
-            # Отримуємо список доступних команд для фільтра
-            from sqlalchemy import func, distinct
-            available_commands = session.query(distinct(Log.command)).filter(
-                Log.command.isnot(None)
-            ).order_by(Log.command).all()
-            available_commands = [cmd[0] for cmd in available_commands]
-            
-            # Пагінація
-            total = query.count()
-            logs_list = query.offset((page-1)*per_page).limit(per_page).all()
-            
-            total_pages = (total + per_page - 1) // per_page
+            # Отримуємо список доступних команд для фільтра (кеш на хвилину)
+            available_commands = _get_available_commands(int(time.time() // 60))
+            
+            total = _get_logs_count(query, (level, search, command))
+            
+            # Пагінація: беремо per_page + 1 запис, щоб знати чи є ще сторінка
+            if before:
+                # Попередня сторінка: йдемо у зворотному порядку від першого запису
+                before_ts, before_id = before
+                page_query = query.filter(or_(
+                    Log.timestamp > before_ts,
+                    and_(Log.timestamp == before_ts, Log.id > before_id)
+                )).order_by(Log.timestamp.asc(), Log.id.asc())
+                logs_list = page_query.limit(per_page + 1).all()
+                has_prev = len(logs_list) > per_page
+                logs_list = list(reversed(logs_list[:per_page]))
+                has_next = True
+            else:
+                page_query = query
+                if after:
+                    after_ts, after_id = after
+                    page_query = page_query.filter(or_(
+                        Log.timestamp < after_ts,
+                        and_(Log.timestamp == after_ts, Log.id < after_id)
+                    ))
+                page_query = page_query.order_by(Log.timestamp.desc(), Log.id.desc())
+                logs_list = page_query.limit(per_page + 1).all()
+                has_next = len(logs_list) > per_page
+                logs_list = logs_list[:per_page]
+                has_prev = after is not None
+            
+            next_cursor = None
+            prev_cursor = None
+            if logs_list:
+                if has_next:
+                    next_cursor = (logs_list[-1].timestamp.isoformat(), logs_list[-1].id)
+                if has_prev:
+                    prev_cursor = (logs_list[0].timestamp.isoformat(), logs_list[0].id)
             
             return render_template('logs.html',
                                  logs=logs_list,
-                                 page=page,
-                                 total_pages=total_pages,
+                                 next_cursor=next_cursor,
+                                 prev_cursor=prev_cursor,
                                  total=total,
                                  level=level,
                                  search=search,
@@ -1407,7 +1703,7 @@ def logs():
                                  available_commands=available_commands)
     except Exception as e:
         flash(f'Помилка завантаження логів: {e}', 'danger')
-        return render_template('logs.html', logs=[], page=1, total_pages=1, total=0, available_commands=[])
+        return render_template('logs.html', logs=[], next_cursor=None, prev_cursor=None, total=0, available_commands=[])
 
 
 @app.route('/logs/clear', methods=['POST'])
@@ -1417,18 +1713,26 @@ def clear_old_logs():
     try:
         action = request.form.get('action', 'old')  # 'old' або 'all'
         
+        _logs_count_cache.clear()
+        _get_available_commands.cache_clear()
+        _stats_cache.clear()
+        
         with get_session() as session:
             if action == 'all':
-                # Видаляємо всі логи
-                deleted = session.query(Log).count()
-                session.query(Log).delete()
+                # Видаляємо всі логи (кількість - з rowcount, без окремого COUNT)
+                deleted = session.query(Log).delete(synchronize_session=False)
+                # Зведена статистика по днях - в тій же транзакції
+                session.query(DailyLogStats).delete(synchronize_session=False)
                 session.commit()
                 flash(f'Видалено всі логи ({deleted} записів)', 'success')
             else:
                 # Видаляємо старі логи
                 days = int(request.form.get('days', 30))
                 cutoff_date = datetime.now() - timedelta(days=days)
-                deleted = session.query(Log).filter(Log.timestamp < cutoff_date).delete()
+                deleted = session.query(Log).filter(Log.timestamp < cutoff_date).delete(synchronize_session=False)
+                session.query(DailyLogStats).filter(
+                    DailyLogStats.date < cutoff_date.date()
+                ).delete(synchronize_session=False)
                 session.commit()
                 flash(f'Видалено {deleted} записів логів старше {days} днів', 'success')
     except Exception as e:
@@ -1442,13 +1746,23 @@ def clear_old_logs():
 def sessions():
     """Перегляд активних сесій користувачів"""
     try:
-        # Очищаємо застарілі сесії перед відображенням
-        cleanup_expired_sessions()
-        
         with get_session() as session:
-            # Отримуємо всі активні сесії з інформацією про користувачів
-            active_sessions = session.query(ActiveSession, User).join(
-                User, ActiveSession.user_id == User.user_id
+            # Очищаємо застарілі сесії перед відображенням (в тій же сесії БД)
+            cleanup_expired_sessions(session)
+            
+            # Отримуємо активні сесії разом з користувачами - тільки колонки, потрібні шаблону
+            # (сортування йде по індексу ix_active_session_active_lastact)
+            active_sessions = session.query(
+                ActiveSession.id,
+                ActiveSession.session_id,
+                ActiveSession.user_id,
+                ActiveSession.ip_address,
+                ActiveSession.user_agent,
+                ActiveSession.login_time,
+                ActiveSession.last_activity,
+                User.display_name.label('user_name')
+            ).join(
+                User, User.user_id == ActiveSession.user_id
             ).filter(
                 ActiveSession.is_active == True
             ).order_by(ActiveSession.last_activity.desc()).all()
@@ -1456,19 +1770,17 @@ def sessions():
             # Поточна сесія адміна
             current_session_id = flask_session.get('session_id')
             
-            sessions_list = []
-            for active_session, user in active_sessions:
-                sessions_list.append({
-                    'id': active_session.id,
-                    'session_id': active_session.session_id,
-                    'user_id': user.user_id,
-                    'user_name': user.full_name or user.username or f"ID: {user.user_id}",
-                    'ip_address': active_session.ip_address,
-                    'user_agent': active_session.user_agent or 'Невідомо',
-                    'login_time': active_session.login_time,
-                    'last_activity': active_session.last_activity,
-                    'is_current': active_session.session_id == current_session_id
-                })
+            sessions_list = [{
+                'id': active_session.id,
+                'session_id': active_session.session_id,
+                'user_id': active_session.user_id,
+                'user_name': active_session.user_name,
+                'ip_address': active_session.ip_address,
+                'user_agent': active_session.user_agent or 'Невідомо',
+                'login_time': active_session.login_time,
+                'last_activity': active_session.last_activity,
+                'is_current': active_session.session_id == current_session_id
+            } for active_session in active_sessions]
         
         return render_template('sessions.html', sessions=sessions_list, current_session_id=current_session_id, current_time=datetime.now())
     except Exception as e:
@@ -1481,32 +1793,37 @@ def sessions():
 @admin_required
 def terminate_session(session_id):
     """Завершення активної сесії користувача"""
+    wants_json = _wants_json()
     try:
         current_session_id = flask_session.get('session_id')
         
         with get_session() as session:
-            active_session = session.query(ActiveSession).filter(
-                ActiveSession.session_id == session_id,
-                ActiveSession.is_active == True
+            # Позначаємо сесію як неактивну одним UPDATE ... RETURNING (без завантаження ORM-об'єкта)
+            terminated = session.execute(
+                update(ActiveSession).where(
+                    ActiveSession.session_id == session_id,
+                    ActiveSession.is_active == True
+                ).values(is_active=False).returning(
+                    ActiveSession.user_id
+                ).execution_options(synchronize_session=False)
             ).first()
             
-            if not active_session:
-                if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            if not terminated:
+                if wants_json:
                     return jsonify({'success': False, 'message': 'Сесію не знайдено'}), 404
                 flash('Сесію не знайдено.', 'danger')
                 return redirect(url_for('sessions'))
             
-            # Отримуємо інформацію про користувача для логування
-            user = session.query(User).filter(User.user_id == active_session.user_id).first()
-            user_name = user.full_name if user and user.full_name else (user.username if user else f"ID: {active_session.user_id}")
-            
-            # Позначаємо сесію як неактивну
-            active_session.is_active = False
             session.commit()
             
+            # Отримуємо інформацію про користувача для логування
+            user_name = session.query(User.display_name).filter(
+                User.user_id == terminated.user_id
+            ).scalar() or f"ID: {terminated.user_id}"
+            
             # Логуємо дію адміністратора
             logger.log_warning(
-                f"Адміністратор {current_user.user_id} ({current_user.full_name}) завершив сесію користувача {active_session.user_id} ({user_name})",
+                f"Адміністратор {current_user.user_id} ({current_user.full_name}) завершив сесію користувача {terminated.user_id} ({user_name})",
                 user_id=current_user.user_id
             )
             
@@ -1514,13 +1831,13 @@ def terminate_session(session_id):
             if session_id == current_session_id:
                 logout_user()
                 flask_session.pop('session_id', None)
-                if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                if wants_json:
                     return jsonify({'success': True, 'redirect': url_for('login')}), 200
                 flash('Вашу сесію було завершено.', 'warning')
                 return redirect(url_for('login'))
             
             # Для чужих сесій повертаємо успішну відповідь
-            if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            if wants_json:
                 return jsonify({'success': True, 'message': 'Сесію завершено'}), 200
             
             flash('Сесію успішно завершено.', 'success')
@@ -1528,41 +1845,57 @@ def terminate_session(session_id):
             
     except Exception as e:
         logger.log_error(f"Помилка завершення сесії {session_id}: {e}")
-        if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        if wants_json:
             return jsonify({'success': False, 'message': 'Помилка завершення сесії'}), 500
         flash('Помилка завершення сесії.', 'danger')
         return redirect(url_for('sessions'))
 
 
+@lru_cache(maxsize=2)
+def _sunday_bounds(today_ordinal: int) -> tuple:
+    """
+    Поточна неділя (початок тижня) та наступна неділя (дата перемикання типу тижня)
+    
+    Args:
+        today_ordinal: date.toordinal() поточної дати - результат кешується в межах дня
+        
+    Returns:
+        Кортеж (current_sunday, next_sunday)
+    """
+    today = date.fromordinal(today_ordinal)
+    # weekday(): 0 = понеділок, 6 = неділя
+    days_since_sunday = (today.weekday() + 1) % 7  # Днів з неділі (0-6, 0 - сьогодні неділя)
+    current_sunday = today - timedelta(days=days_since_sunday)
+    return current_sunday, current_sunday + timedelta(days=7)
+
+
 @app.route('/settings')
 @admin_required
 def settings():
     """Загальні налаштування"""
     try:
         with get_session() as session:
-            metadata = session.query(ScheduleMetadata).first()
-            configs = session.query(BotConfig).all()
-            
-            config_dict = {c.key: c.value for c in configs}
+            def _load_settings():
+                metadata_obj = session.query(ScheduleMetadata).first()
+                # Знімок колонок замість ORM-об'єкта - безпечно ділити між запитами
+                metadata_snapshot = SimpleNamespace(**{
+                    column.key: getattr(metadata_obj, column.key)
+                    for column in ScheduleMetadata.__table__.columns
+                }) if metadata_obj else None
+                configs = session.query(BotConfig.key, BotConfig.value).all()
+                return metadata_snapshot, {c.key: c.value for c in configs}
+            
+            metadata, config_dict = _get_cached_lookup('settings', _load_settings)
             
             # Обчислюємо поточний тип тижня (автоматично) та наступну дату перемикання
             current_week_type = None
             next_switch_date = None
             if metadata and metadata.numerator_start_date:
-                from schedule_handler import get_schedule_handler
-                schedule_handler = get_schedule_handler()
-                if schedule_handler:
-                    current_week_type = schedule_handler.get_current_week_type()
+                if get_schedule_handler():
+                    current_week_type = _get_current_week_type(session)
                     
-                    # Обчислюємо наступну неділю (дата перемикання)
-                    today = datetime.now().date()
-                    days_since_sunday = today.weekday() + 1  # Днів з неділі (1-7)
-                    if days_since_sunday == 7:
-                        # Сьогодні неділя, наступна неділя через тиждень
-                        next_switch_date = today + timedelta(days=7)
-                    else:
-                        # Наступна неділя
-                        next_switch_date = today + timedelta(days=(7 - days_since_sunday))
+                    # Наступна неділя (дата перемикання); якщо сьогодні неділя - через тиждень
+                    _, next_switch_date = _sunday_bounds(date.today().toordinal())
             
             return render_template('settings.html',
                                  metadata=metadata,
@@ -1601,17 +1934,8 @@ def update_settings():
                     week_changed = True
                     
                     # Встановлюємо дату початку відліку для автоматичного перемикання
-                    # Знаходимо поточну неділю (початок поточного тижня)
-                    today = datetime.now().date()
-                    # weekday(): 0 = понеділок, 6 = неділя
-                    # Знаходимо найближчу минулу неділю (або сьогодні, якщо сьогодні неділя)
-                    days_since_sunday = today.weekday() + 1  # Днів з неділі (1-7)
-                    if days_since_sunday == 7:
-                        # Сьогодні неділя
-                        current_sunday = today
-                    else:
-                        # Знаходимо минулу неділю (початок поточного тижня)
-                        current_sunday = today - timedelta(days=days_since_sunday)
+                    # Поточна неділя - найближча минула неділя (або сьогодні, якщо сьогодні неділя)
+                    current_sunday, _ = _sunday_bounds(date.today().toordinal())
                     
                     # Встановлюємо дату початку відліку = поточна неділя
                     # Якщо встановлено "Чисельник", то week_number = 0 (парне) = чисельник
@@ -1633,17 +1957,21 @@ def update_settings():
             metadata.last_updated = datetime.now()
             session.commit()
             
-            # Очищаємо кеш розкладу при зміні типу тижня
+            # Очищаємо кеш розкладу при зміні типу тижня - після завершення обробника,
+            # коли сесія БД вже закрита (але до відправки редіректу, щоб наступний
+            # запит не отримав застарілий тип тижня)
             if week_changed:
-                try:
-                    from schedule_handler import get_schedule_handler
-                    schedule_handler = get_schedule_handler()
-                    if schedule_handler:
-                        schedule_handler._cache = {}  # Очищаємо кеш
-                        schedule_handler._cache_time = None
-                except Exception as e:
-                    # Логуємо помилку, але не блокуємо збереження налаштувань
-                    logger.log_error(f"Помилка очищення кешу: {e}")
+                @after_this_request
+                def _clear_schedule_cache(response):
+                    try:
+                        schedule_handler = get_schedule_handler()
+                        if schedule_handler:
+                            schedule_handler._cache = {}  # Очищаємо кеш
+                            schedule_handler._cache_time = None
+                    except Exception as e:
+                        # Логуємо помилку, але не блокуємо збереження налаштувань
+                        logger.log_error(f"Помилка очищення кешу: {e}")
+                    return response
             
             if not week_changed:
                 flash('Налаштування оновлено!', 'success')
@@ -1653,6 +1981,16 @@ def update_settings():
     return redirect(url_for('settings'))
 
 
+# Шаблон повідомлення розробнику (збирається один раз при завантаженні модуля)
+DEVELOPER_MESSAGE_TEMPLATE = (
+    "🔧 <b>Повідомлення від адміністратора</b>\n\n"
+    "👤 <b>Від:</b> {admin_name}\n"
+    "🆔 <b>User ID:</b> {user_id}\n"
+    "📋 <b>Тема:</b> {subject}\n\n"
+    "💬 <b>Повідомлення:</b>\n{message}"
+)
+
+
 @app.route('/contact-developer', methods=['GET', 'POST'])
 @login_required
 def contact_developer():
@@ -1673,14 +2011,13 @@ def contact_developer():
                 return render_template('contact_developer.html')
             
             # Формуємо повідомлення для розробника
-            admin_name = current_user.full_name or current_user.username or f"ID: {current_user.user_id}"
-            telegram_message = (
-                f"🔧 <b>Повідомлення від адміністратора</b>\n\n"
-                f"👤 <b>Від:</b> {admin_name}\n"
-                f"🆔 <b>User ID:</b> {current_user.user_id}\n"
-                f"📋 <b>Тема:</b> {subject}\n\n"
-                f"💬 <b>Повідомлення:</b>\n{message}"
-            )
+            admin_name = current_user.display_name
+            telegram_message = DEVELOPER_MESSAGE_TEMPLATE.format_map({
+                'admin_name': admin_name,
+                'user_id': current_user.user_id,
+                'subject': subject,
+                'message': message
+            })
             
             # Відправляємо повідомлення розробнику
             developer_id = int(DEVELOPER_TELEGRAM_ID)
@@ -1697,42 +2034,50 @@ def contact_developer():
     return render_template('contact_developer.html', developer_configured=developer_configured)
 
 
+# Рядок списку викладачів для вибору отримувачів оголошення
+_TeacherOption = namedtuple('_TeacherOption', 'user_id username full_name')
+
+
 @app.route('/announcements')
 @admin_required
 def announcements():
     """Управління оголошеннями"""
     try:
-        from announcement_manager import get_announcement_manager
-        announcement_manager = get_announcement_manager()
-        
         # Отримуємо історію оголошень та список викладачів в одній сесії
         with get_session() as session:
-            # Отримуємо історію оголошень
-            announcements_list = session.query(Announcement).order_by(
-                Announcement.sent_at.desc()
-            ).limit(100).all()
-            
-            announcement_history = []
-            for ann in announcements_list:
-                announcement_history.append({
+            def _load_announcement_history():
+                # Тільки перші 101 символ тексту - достатньо для прев'ю та ознаки обрізання
+                announcements_list = session.query(
+                    Announcement.id,
+                    func.substr(Announcement.content, 1, 101).label('preview'),
+                    Announcement.author_username, Announcement.priority, Announcement.sent_at,
+                    Announcement.recipient_count, Announcement.created_at
+                ).order_by(
+                    Announcement.sent_at.desc()
+                ).limit(100).all()
+                
+                return [{
                     'id': ann.id,
-                    'content': ann.content[:100] + '...' if len(ann.content) > 100 else ann.content,
+                    'content': ann.preview[:100] + '...' if len(ann.preview) > 100 else ann.preview,
                     'author_username': ann.author_username,
                     'priority': ann.priority,
                     'sent_at': ann.sent_at if ann.sent_at else None,
                     'recipient_count': ann.recipient_count or 0,
                     'created_at': ann.created_at
-                })
+                } for ann in announcements_list]
             
-            # Отримуємо список викладачів для вибору
-            teachers_list = session.query(User).all()
-            teachers = []
-            for teacher in teachers_list:
-                teachers.append({
-                    'user_id': teacher.user_id,
-                    'username': teacher.username or f"user_{teacher.user_id}",
-                    'full_name': getattr(teacher, 'full_name', None)
-                })
+            # Історія оголошень (кешується, скидається при зміні Announcement)
+            announcement_history = _get_cached_lookup('announcements', _load_announcement_history)
+            
+            # Отримуємо список викладачів для вибору (спільний кеш з розкладом)
+            teachers_list = _get_cached_lookup(
+                'teachers',
+                lambda: _load_teachers(session)
+            )
+            teachers = [
+                _TeacherOption(teacher.user_id, teacher.username or f"user_{teacher.user_id}", teacher.full_name)
+                for teacher in teachers_list
+            ]
         
         return render_template('announcements.html',
                              announcements=announcement_history,
@@ -1747,7 +2092,6 @@ def announcements():
 def create_announcement():
     """Створення та відправка оголошення"""
     try:
-        from announcement_manager import get_announcement_manager
         announcement_manager = get_announcement_manager()
         
         content = request.form.get('content', '').strip()
@@ -1821,7 +2165,6 @@ def edit_announcement(ann_id):
 def delete_announcement(ann_id):
     """Видалення оголошення"""
     try:
-        from announcement_manager import get_announcement_manager
         announcement_manager = get_announcement_manager()
         
         if announcement_manager.delete_announcement(ann_id):
@@ -1839,12 +2182,12 @@ def delete_announcement(ann_id):
 def announcement_recipients(ann_id):
     """Перегляд отримувачів оголошення"""
     try:
-        from announcement_manager import get_announcement_manager
-        announcement_manager = get_announcement_manager()
-        
         # Отримуємо оголошення та отримувачів в одній сесії
         with get_session() as session:
-            announcement_obj = session.query(Announcement).filter(Announcement.id == ann_id).first()
+            # Оголошення, отримувачі (один IN-запит) та їх користувачі (JOIN) - без N+1
+            announcement_obj = session.query(Announcement).options(
+                selectinload(Announcement.recipients).joinedload(AnnouncementRecipient.user)
+            ).filter(Announcement.id == ann_id).first()
             if not announcement_obj:
                 flash('Оголошення не знайдено!', 'warning')
                 return redirect(url_for('announcements'))
@@ -1860,19 +2203,14 @@ def announcement_recipients(ann_id):
                 'created_at': announcement_obj.created_at
             }
             
-            # Отримуємо отримувачів
-            recipients_list = session.query(AnnouncementRecipient, User).join(
-                User, AnnouncementRecipient.recipient_user_id == User.user_id
-            ).filter(
-                AnnouncementRecipient.announcement_id == ann_id
-            ).all()
-            
+            # Отримувачі видаленого користувача залишаються в історії без даних профілю
             recipients = []
-            for recipient, user in recipients_list:
+            for recipient in announcement_obj.recipients:
+                user = recipient.user
                 recipients.append({
                     'recipient_user_id': recipient.recipient_user_id,
-                    'username': user.username or f"user_{user.user_id}",
-                    'full_name': getattr(user, 'full_name', None),
+                    'username': (user.username if user else None) or f"user_{recipient.recipient_user_id}",
+                    'full_name': user.full_name if user else None,
                     'sent_at': recipient.sent_at,
                     'status': recipient.status
                 })
@@ -1885,6 +2223,13 @@ def announcement_recipients(ann_id):
         return redirect(url_for('announcements'))
 
 
+# Рядок таблиці закритих опитувань
+_ClosedPoll = namedtuple(
+    '_ClosedPoll',
+    'id question author_name created_at closed_at response_count report_sent is_anonymous'
+)
+
+
 @app.route('/polls')
 @admin_required
 def polls():
@@ -1895,32 +2240,37 @@ def polls():
         
         # Отримуємо закриті опитування
         with get_session() as session:
-            closed_polls = session.query(Poll).filter(
+            # Автор (LEFT JOIN) та кількість відповідей (корельований підзапит) - одним запитом
+            response_count = select(func.count(PollResponse.id)).where(
+                PollResponse.poll_id == Poll.id
+            ).correlate(Poll).scalar_subquery()
+            
+            closed_polls = session.query(
+                Poll.id, Poll.question, Poll.author_id, Poll.author_username,
+                Poll.created_at, Poll.closed_at, Poll.report_sent, Poll.is_anonymous,
+                User.full_name.label('author_full_name'),
+                response_count.label('response_count')
+            ).outerjoin(
+                User, User.user_id == Poll.author_id
+            ).filter(
                 Poll.is_closed == True
             ).order_by(Poll.closed_at.desc()).limit(50).all()
             
-            closed_polls_data = []
-            for poll in closed_polls:
-                author = session.query(User).filter(User.user_id == poll.author_id).first()
-                author_name = author.full_name if author and author.full_name else poll.author_username or f"ID: {poll.author_id}"
-                
-                response_count = session.query(PollResponse).filter(
-                    PollResponse.poll_id == poll.id
-                ).count()
-                
-                closed_polls_data.append({
-                    'id': poll.id,
-                    'question': poll.question,
-                    'author_name': author_name,
-                    'created_at': poll.created_at,
-                    'closed_at': poll.closed_at,
-                    'response_count': response_count,
-                    'report_sent': poll.report_sent,
-                    'is_anonymous': poll.is_anonymous
-                })
-        
-        # Отримуємо список всіх користувачів для вибору отримувачів
-        all_users = session.query(User).filter(User.role == 'user').order_by(User.full_name, User.username).all()
+            closed_polls_data = [_ClosedPoll(
+                poll.id,
+                poll.question,
+                poll.author_full_name or poll.author_username or f"ID: {poll.author_id}",
+                poll.created_at,
+                poll.closed_at,
+                poll.response_count,
+                poll.report_sent,
+                poll.is_anonymous
+            ) for poll in closed_polls]
+            
+            # Отримуємо список всіх користувачів для вибору отримувачів (тільки потрібні колонки)
+            all_users = session.query(User.user_id, User.full_name, User.username).filter(
+                User.role == 'user'
+            ).order_by(User.full_name, User.username).all()
         
         return render_template('polls.html', active_polls=active_polls, closed_polls=closed_polls_data, all_users=all_users)
     except Exception as e:
@@ -1928,6 +2278,21 @@ def polls():
         return render_template('polls.html', active_polls=[], closed_polls=[])
 
 
+# Термін дії опитування: 'YYYY-MM-DDTHH:MM' (datetime-local) або 'YYYY-MM-DD HH:MM'
+_DT_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})')
+
+
+def _parse_expires_at(value: str) -> Optional[datetime]:
+    """Розбір терміну дії опитування; None якщо формат або дата невірні"""
+    match = _DT_RE.fullmatch(value)
+    if not match:
+        return None
+    try:
+        return datetime(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
 @app.route('/polls/create', methods=['POST'])
 @admin_required
 def create_poll():
@@ -1956,14 +2321,10 @@ def create_poll():
         # Парсимо термін дії
         expires_at = None
         if expires_at_str:
-            try:
-                expires_at = datetime.strptime(expires_at_str, '%Y-%m-%dT%H:%M')
-            except ValueError:
-                try:
-                    expires_at = datetime.strptime(expires_at_str, '%Y-%m-%d %H:%M')
-                except ValueError:
-                    flash('Невірний формат дати терміну дії!', 'warning')
-                    return redirect(url_for('polls'))
+            expires_at = _parse_expires_at(expires_at_str)
+            if expires_at is None:
+                flash('Невірний формат дати терміну дії!', 'warning')
+                return redirect(url_for('polls'))
         
         poll_manager = get_poll_manager()
         # Автор завжди адмін (з веб-інтерфейсу)
@@ -2032,14 +2393,10 @@ def edit_poll(poll_id):
                 # Парсимо термін дії
                 expires_at = None
                 if expires_at_str:
-                    try:
-                        expires_at = datetime.strptime(expires_at_str, '%Y-%m-%dT%H:%M')
-                    except ValueError:
-                        try:
-                            expires_at = datetime.strptime(expires_at_str, '%Y-%m-%d %H:%M')
-                        except ValueError:
-                            flash('Невірний формат дати терміну дії!', 'warning')
-                            return redirect(url_for('edit_poll', poll_id=poll_id))
+                    expires_at = _parse_expires_at(expires_at_str)
+                    if expires_at is None:
+                        flash('Невірний формат дати терміну дії!', 'warning')
+                        return redirect(url_for('edit_poll', poll_id=poll_id))
                 
                 poll_manager = get_poll_manager()
                 if poll_manager.update_poll(
@@ -2049,6 +2406,7 @@ def edit_poll(poll_id):
                     expires_at=expires_at,
                     is_anonymous=is_anonymous
                 ):
+                    _poll_results_cache.pop(poll_id, None)
                     flash(f'Опитування ID {poll_id} успішно оновлено!', 'success')
                 else:
                     flash('Помилка оновлення опитування!', 'danger')
@@ -2077,46 +2435,90 @@ def edit_poll(poll_id):
         return redirect(url_for('polls'))
 
 
+# Кеш результатів опитувань: {poll_id: (відбиток, результати, час)}
+# Відбиток (is_closed, кількість відповідей, час останньої відповіді) змінюється при кожному голосі,
+# у тому числі з процесу бота; закриті опитування кешуються без TTL
+_poll_results_cache: Dict[int, tuple] = {}
+_POLL_RESULTS_CACHE_TTL = 60  # секунд
+_POLL_RESULTS_CACHE_MAX = 512
+
+
+def _poll_results_fingerprint(session, poll_id: int) -> Optional[tuple]:
+    """Відбиток стану опитування для перевірки кешу; None якщо опитування не існує"""
+    row = session.query(
+        Poll.is_closed,
+        func.count(PollResponse.id),
+        func.max(PollResponse.responded_at)
+    ).outerjoin(
+        PollResponse, PollResponse.poll_id == Poll.id
+    ).filter(
+        Poll.id == poll_id
+    ).group_by(Poll.id).first()
+    return tuple(row) if row else None
+
+
+def _load_poll_results(poll_id: int) -> Optional[Dict[str, Any]]:
+    """Результати опитування разом з відповідями користувачів (для неанонімних)"""
+    poll_manager = get_poll_manager()
+    results = poll_manager.get_poll_results(poll_id)
+    if not results:
+        return None
+    
+    # Отримуємо відповіді користувачів (тільки для неанонімних опитувань)
+    user_responses = []
+    if not results['is_anonymous']:
+        with get_session() as session:
+            responses = session.query(
+                PollResponse.user_id, PollResponse.responded_at,
+                User.username, User.full_name, PollOption.option_text
+            ).outerjoin(
+                # Відповіді видалених користувачів зберігаються для статистики
+                User, PollResponse.user_id == User.user_id
+            ).join(
+                PollOption, PollResponse.option_id == PollOption.id
+            ).filter(
+                PollResponse.poll_id == poll_id
+            ).order_by(PollResponse.responded_at.desc()).all()
+            
+            user_responses = [{
+                'user_id': response.user_id,
+                'username': response.username or f"user_{response.user_id}",
+                'full_name': response.full_name,
+                'option_text': response.option_text,
+                'response_time': response.responded_at
+            } for response in responses]
+    
+    results['user_responses'] = user_responses
+    return results
+
+
 @app.route('/polls/<int:poll_id>/results')
 @admin_required
 def poll_results(poll_id):
     """Результати опитування"""
     try:
-        poll_manager = get_poll_manager()
-        results = poll_manager.get_poll_results(poll_id)
+        with get_session() as session:
+            fingerprint = _poll_results_fingerprint(session, poll_id)
+        
+        results = None
+        cached = _poll_results_cache.get(poll_id)
+        if fingerprint and cached and cached[0] == fingerprint:
+            is_closed = fingerprint[0]
+            if is_closed or (datetime.now() - cached[2]).total_seconds() < _POLL_RESULTS_CACHE_TTL:
+                results = cached[1]
+        
+        if results is None and fingerprint:
+            results = _load_poll_results(poll_id)
+            if results:
+                if len(_poll_results_cache) >= _POLL_RESULTS_CACHE_MAX:
+                    _poll_results_cache.clear()
+                _poll_results_cache[poll_id] = (fingerprint, results, datetime.now())
         
         if not results:
+            _poll_results_cache.pop(poll_id, None)
             flash('Опитування не знайдено!', 'warning')
             return redirect(url_for('polls'))
         
-        # Отримуємо інформацію про опитування (для перевірки is_anonymous)
-        with get_session() as session:
-            poll = session.query(Poll).filter(Poll.id == poll_id).first()
-            is_anonymous = poll.is_anonymous if poll else False
-            
-            # Отримуємо відповіді користувачів (тільки для неанонімних опитувань)
-            user_responses = []
-            if not is_anonymous:
-                responses = session.query(PollResponse, User, PollOption).join(
-                    User, PollResponse.user_id == User.user_id
-                ).join(
-                    PollOption, PollResponse.option_id == PollOption.id
-                ).filter(
-                    PollResponse.poll_id == poll_id
-                ).order_by(PollResponse.responded_at.desc()).all()
-                
-                for response, user, option in responses:
-                    user_responses.append({
-                        'user_id': user.user_id,
-                        'username': user.username or f"user_{user.user_id}",
-                        'full_name': user.full_name,
-                        'option_text': option.option_text,
-                        'response_time': response.responded_at
-                    })
-        
-        results['is_anonymous'] = is_anonymous
-        results['user_responses'] = user_responses
-        
         return render_template('poll_results.html', results=results)
     except Exception as e:
         flash(f'Помилка завантаження результатів: {e}', 'danger')
@@ -2197,7 +2599,8 @@ def delete_poll(poll_id):
     """Видалення закритого опитування з бази даних"""
     try:
         with get_session() as session:
-            poll = session.query(Poll).filter(Poll.id == poll_id).first()
+            # Тільки колонки для перевірки та повідомлення (без ORM-об'єкта)
+            poll = session.query(Poll.is_closed, Poll.question).filter(Poll.id == poll_id).first()
             
             if not poll:
                 flash('Опитування не знайдено!', 'warning')
@@ -2208,14 +2611,19 @@ def delete_poll(poll_id):
                 flash('Можна видаляти тільки закриті опитування!', 'warning')
                 return redirect(url_for('polls'))
             
-            # Отримуємо кількість відповідей для інформації
-            response_count = session.query(PollResponse).filter(
-                PollResponse.poll_id == poll_id
-            ).count()
+            # Видаляємо відповіді одним DELETE - rowcount дає їх кількість без окремого COUNT
+            response_count = session.execute(
+                sa_delete(PollResponse).where(
+                    PollResponse.poll_id == poll_id
+                ).execution_options(synchronize_session=False)
+            ).rowcount
             
-            # Видаляємо опитування (CASCADE автоматично видалить PollOption та PollResponse)
-            session.delete(poll)
+            # Видаляємо опитування (CASCADE автоматично видалить PollOption)
+            session.execute(
+                sa_delete(Poll).where(Poll.id == poll_id).execution_options(synchronize_session=False)
+            )
             session.commit()
+            _poll_results_cache.pop(poll_id, None)
             
             flash(
                 f'Опитування "{poll.question[:50]}..." успішно видалено! '
@@ -2243,24 +2651,16 @@ def academic():
             
             # Отримуємо викладачів для вибору
             if current_user.is_admin:
-                # Для адмінів - всі викладачі
-                teachers = session.query(User).all()
-                existing_teacher_ids = {t.user_id for t in teachers}
-                
-                # Також додаємо викладачів, які є в періодах (teacher_user_id), але можуть не бути в списку користувачів
-                teachers_in_periods = session.query(AcademicPeriod.teacher_user_id).distinct().all()
-                teacher_ids_in_periods = {t[0] for t in teachers_in_periods if t[0] is not None}
-                
-                # Додаємо викладачів з періодів, яких немає в списку
-                for teacher_id in teacher_ids_in_periods:
-                    if teacher_id not in existing_teacher_ids:
-                        user = session.query(User).filter(User.user_id == teacher_id).first()
-                        if user:
-                            teachers.append(user)
+                # Для адмінів - всі викладачі (спільний кеш з розкладом, тільки потрібні колонки)
+                # Викладачі з періодів довантажуються з тієї ж таблиці users, тому цей
+                # список вже містить усіх викладачів, на яких посилаються періоди
+                teachers = _get_cached_lookup(
+                    'teachers',
+                    lambda: _load_teachers(session)
+                )
             else:
                 # Для звичайних користувачів - тільки поточний користувач
                 teachers = [current_user]
-                existing_teacher_ids = {current_user.user_id}
             
             # Отримуємо періоди з фільтрацією
             # Показуємо тільки періоди з встановленим teacher_user_id (не загальні)
@@ -2278,7 +2678,7 @@ def academic():
             for period in periods:
                 if period.teacher_user_id and period.teacher_user_id in teachers_dict:
                     teacher = teachers_dict[period.teacher_user_id]
-                    period.teacher_display = teacher.full_name if teacher.full_name else (teacher.username or f"ID: {teacher.user_id}")
+                    period.teacher_display = teacher.display_name
                 else:
                     period.teacher_display = f"ID: {period.teacher_user_id}" if period.teacher_user_id else "Загальний"
             
@@ -2451,8 +2851,12 @@ def copy_academic_calendar():
                 return redirect(url_for('academic'))
             
             # Отримуємо всі періоди від вихідного викладача
+            # (тільки колонки, що копіюються - без ORM-об'єктів)
             source_periods = session.query(AcademicPeriod).filter(
                 AcademicPeriod.teacher_user_id == from_teacher_id
+            ).with_entities(
+                AcademicPeriod.name, AcademicPeriod.start_date, AcademicPeriod.end_date,
+                AcademicPeriod.weeks, AcademicPeriod.color, AcademicPeriod.description
             ).all()
             
             if not source_periods:
@@ -2460,36 +2864,30 @@ def copy_academic_calendar():
                 return redirect(url_for('academic'))
             
             # Якщо replace_existing, видаляємо існуючі періоди цільового викладача
+            # (одним DELETE ... WHERE замість завантаження та видалення кожного періоду)
             if replace_existing:
-                existing_periods = session.query(AcademicPeriod).filter(
+                session.query(AcademicPeriod).filter(
                     AcademicPeriod.teacher_user_id == to_teacher_id
-                ).all()
-                for period in existing_periods:
-                    session.delete(period)
-            
-            # Копіюємо періоди
-            copied_count = 0
-            for source_period in source_periods:
-                # Генеруємо унікальний period_id для нового періоду
-                new_period_id = f"{to_teacher_id}_{uuid.uuid4().hex[:8]}"
-                
-                new_period = AcademicPeriod(
-                    period_id=new_period_id,
-                    name=source_period.name,
-                    start_date=source_period.start_date,
-                    end_date=source_period.end_date,
-                    weeks=source_period.weeks,
-                    color=source_period.color,
-                    description=source_period.description,
+                ).delete(synchronize_session=False)
+            
+            # Копіюємо періоди одним executemany замість session.add() для кожного періоду
+            # Випадкові суфікси period_id для всіх періодів - одним викликом os.urandom
+            suffixes = os.urandom(4 * len(source_periods)).hex()
+            rows = [
+                dict(
+                    source_period._asdict(),
+                    period_id=f"{to_teacher_id}_{suffixes[i * 8:(i + 1) * 8]}",  # Унікальний period_id для нового періоду
                     teacher_user_id=to_teacher_id
                 )
-                session.add(new_period)
-                copied_count += 1
+                for i, source_period in enumerate(source_periods)
+            ]
+            session.bulk_insert_mappings(AcademicPeriod, rows)
+            copied_count = len(rows)
             
             session.commit()
             
-            from_name = from_teacher.full_name or from_teacher.username or f"ID: {from_teacher_id}"
-            to_name = to_teacher.full_name or to_teacher.username or f"ID: {to_teacher_id}"
+            from_name = from_teacher.display_name
+            to_name = to_teacher.display_name
             flash(f'Академічний календар скопійовано від {from_name} до {to_name}! Скопійовано періодів: {copied_count}', 'success')
     except Exception as e:
         flash(f'Помилка копіювання академічного календаря: {e}', 'danger')
@@ -2497,6 +2895,51 @@ def copy_academic_calendar():
     return redirect(url_for('academic'))
 
 
+@lru_cache(maxsize=256)
+def _parse_time_slot(time_str: str) -> Optional[tuple]:
+    """
+    Розбір часу заняття у форматі "HH:MM-HH:MM" (кешується - різних слотів лише кілька десятків)
+    
+    Returns:
+        (start_time, end_time, duration_minutes) або None якщо формат невірний;
+        duration_minutes може бути від'ємним, якщо заняття переходить через північ
+    """
+    try:
+        start_str, end_str = time_str.split('-')
+        start_hour, start_minute = start_str.split(':')
+        end_hour, end_minute = end_str.split(':')
+        start_time = dt_time(int(start_hour), int(start_minute))
+        end_time = dt_time(int(end_hour), int(end_minute))
+    except (ValueError, AttributeError):
+        return None
+    duration_minutes = (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+    return start_time, end_time, duration_minutes
+
+
+@lru_cache(maxsize=256)
+def _slot_progress(time_str: str) -> tuple:
+    """
+    Дані слоту для прогрес-бару монітора навчального процесу (кешується по рядку часу)
+    
+    Returns:
+        (start_time_str, end_time_str, duration_minutes) або (None, None, None) якщо формат невірний
+    """
+    slot = _parse_time_slot(time_str)
+    if not slot:
+        return None, None, None
+    start_time, end_time, duration_minutes = slot
+    # Заняття через північ закінчується наступного дня
+    if duration_minutes < 0:
+        duration_minutes += 24 * 60
+    # Час початку та кінця як рядки для JavaScript
+    return start_time.strftime('%H:%M'), end_time.strftime('%H:%M'), duration_minutes
+
+
+def _empty_schedule(days) -> Dict[str, Dict[str, list]]:
+    """Порожній розклад: {день: {'numerator': [], 'denominator': []}} для кожного дня"""
+    return {day: {'numerator': [], 'denominator': []} for day in days}
+
+
 def calculate_teacher_workload(session, teacher_user_id: int) -> Dict[str, Any]:
     """
     Розрахунок навантаження годин для викладача за тиждень
@@ -2508,48 +2951,70 @@ def calculate_teacher_workload(session, teacher_user_id: int) -> Dict[str, Any]:
     Returns:
         Словник з навантаженням: total_hours, by_day, by_type, lessons_count
     """
+    return calculate_teachers_workload(session, [teacher_user_id])[teacher_user_id]
+
+
+def calculate_teachers_workload(session, teacher_user_ids: list) -> Dict[int, Dict[str, Any]]:
+    """
+    Розрахунок навантаження годин для кількох викладачів одним запитом
+    
+    Args:
+        session: SQLAlchemy session
+        teacher_user_ids: Список ID викладачів
+        
+    Returns:
+        Словник {teacher_user_id: {total_hours, by_day, by_type, lessons_count}}
+    """
+    workloads = {
+        teacher_user_id: {'total_hours': 0, 'by_day': {}, 'by_type': {}, 'lessons_count': 0}
+        for teacher_user_id in teacher_user_ids
+    }
+    if not workloads:
+        return workloads
+    
     try:
-        # Отримуємо всі заняття викладача
-        entries = session.query(ScheduleEntry).filter(
-            ScheduleEntry.teacher_user_id == teacher_user_id
+        # Групуємо заняття в БД: один рядок на (викладач, день, тип, час) з кількістю занять
+        # замість передачі кожного запису - тривалість однакового слоту рахується один раз
+        slot_counts = session.query(
+            ScheduleEntry.teacher_user_id,
+            ScheduleEntry.day_of_week,
+            ScheduleEntry.lesson_type,
+            ScheduleEntry.time,
+            func.count(ScheduleEntry.id)
+        ).filter(
+            ScheduleEntry.teacher_user_id.in_(list(workloads))
+        ).group_by(
+            ScheduleEntry.teacher_user_id,
+            ScheduleEntry.day_of_week,
+            ScheduleEntry.lesson_type,
+            ScheduleEntry.time
         ).all()
         
-        # Розраховуємо години
-        total_hours = 0
-        by_day = {}
-        by_type = {}
-        lessons_count = 0
-        
-        for entry in entries:
+        for teacher_user_id, day, lesson_type, time_str, count in slot_counts:
             # Парсимо час (наприклад, "08:30-09:50")
-            try:
-                time_str = entry.time
-                if '-' in time_str:
-                    start_str, end_str = time_str.split('-')
-                    start = datetime.strptime(start_str, "%H:%M")
-                    end = datetime.strptime(end_str, "%H:%M")
-                    duration = (end - start).total_seconds() / 3600  # Години
-                    total_hours += duration
-                    lessons_count += 1
-                    
-                    # По днях
-                    day = entry.day_of_week
-                    by_day[day] = by_day.get(day, 0) + duration
-                    
-                    # По типах заняття
-                    lesson_type = entry.lesson_type
-                    by_type[lesson_type] = by_type.get(lesson_type, 0) + duration
-            except (ValueError, AttributeError):
+            slot = _parse_time_slot(time_str)
+            if not slot:
                 continue
+            duration = slot[2] / 60 * count  # Години
+            
+            workload = workloads[teacher_user_id]
+            workload['total_hours'] += duration
+            workload['lessons_count'] += count
+            
+            # По днях
+            workload['by_day'][day] = workload['by_day'].get(day, 0) + duration
+            
+            # По типах заняття
+            workload['by_type'][lesson_type] = workload['by_type'].get(lesson_type, 0) + duration
         
+        for workload in workloads.values():
+            workload['total_hours'] = round(workload['total_hours'], 2)
+        return workloads
+    except Exception as e:
         return {
-            'total_hours': round(total_hours, 2),
-            'by_day': by_day,
-            'by_type': by_type,
-            'lessons_count': lessons_count
+            teacher_user_id: {'total_hours': 0, 'by_day': {}, 'by_type': {}, 'lessons_count': 0}
+            for teacher_user_id in teacher_user_ids
         }
-    except Exception as e:
-        return {'total_hours': 0, 'by_day': {}, 'by_type': {}, 'lessons_count': 0}
 
 
 def calculate_teacher_workload_by_week_type(session, teacher_user_id: int, week_type: str) -> Dict[str, Any]:
@@ -2565,27 +3030,23 @@ def calculate_teacher_workload_by_week_type(session, teacher_user_id: int, week_
         Словник з навантаженням: total_hours, lessons_count
     """
     try:
-        # Отримуємо заняття викладача для конкретного типу тижня
-        entries = session.query(ScheduleEntry).filter(
+        # Кількість занять викладача по кожному слоту часу для конкретного типу тижня
+        slot_counts = session.query(
+            ScheduleEntry.time,
+            func.count(ScheduleEntry.id)
+        ).filter(
             ScheduleEntry.teacher_user_id == teacher_user_id,
             ScheduleEntry.week_type == week_type
-        ).all()
+        ).group_by(ScheduleEntry.time).all()
         
         total_hours = 0
         lessons_count = 0
         
-        for entry in entries:
-            try:
-                time_str = entry.time
-                if '-' in time_str:
-                    start_str, end_str = time_str.split('-')
-                    start = datetime.strptime(start_str, "%H:%M")
-                    end = datetime.strptime(end_str, "%H:%M")
-                    duration = (end - start).total_seconds() / 3600
-                    total_hours += duration
-                    lessons_count += 1
-            except (ValueError, AttributeError):
-                continue
+        for time_str, count in slot_counts:
+            slot = _parse_time_slot(time_str)
+            if slot:
+                total_hours += slot[2] / 60 * count
+                lessons_count += count
         
         return {
             'total_hours': round(total_hours, 2),
@@ -2595,86 +3056,108 @@ def calculate_teacher_workload_by_week_type(session, teacher_user_id: int, week_
         return {'total_hours': 0, 'lessons_count': 0}
 
 
+# Кеш даних сторінки статистики: {дата: (дані, час)}
+# Агрегати по логах змінюються повільно; ключ по даті скидає кеш при зміні доби
+_stats_cache: Dict[date, tuple] = {}
+_STATS_CACHE_TTL = 300  # секунд
+
+
+def _load_stats_data() -> Dict[str, Any]:
+    """Агрегати для сторінки статистики"""
+    with get_session() as session:
+        # Статистика по командах
+        command_stats = session.query(
+            Log.command,
+            func.count(Log.id).label('count')
+        ).filter(
+            Log.command.isnot(None)
+        ).group_by(Log.command).order_by(func.count(Log.id).desc()).limit(10).all()
+        
+        # Активність по днях (останні 30 днів) - із зведеної таблиці замість сканування logs
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        daily_activity = session.query(
+            DailyLogStats.date.label('date'),
+            func.sum(DailyLogStats.count).label('count')
+        ).filter(
+            DailyLogStats.date >= thirty_days_ago.date()
+        ).group_by(DailyLogStats.date).order_by(DailyLogStats.date).all()
+        
+        # Топ активних користувачів
+        top_users = session.query(
+            Log.user_id,
+            func.count(Log.id).label('activity_count')
+        ).filter(
+            Log.user_id.isnot(None),
+            Log.timestamp >= thirty_days_ago
+        ).group_by(Log.user_id).order_by(func.count(Log.id).desc()).limit(10).all()
+        
+        # Отримуємо імена користувачів одним IN-запитом (логи можуть посилатися на видалених)
+        usernames = dict(session.query(User.user_id, User.username).filter(
+            User.user_id.in_([user_id for user_id, _ in top_users])
+        ).all()) if top_users else {}
+        user_activity = [{
+            'user_id': user_id,
+            'username': usernames[user_id] if user_id in usernames else 'невідомий',
+            'count': count
+        } for user_id, count in top_users]
+        
+        # Навантаження викладачів (заняття всіх викладачів одним запитом)
+        teachers = session.query(User.user_id, User.username, User.full_name).filter(
+            User.role == 'user'
+        ).all()
+        workloads = calculate_teachers_workload(session, [teacher.user_id for teacher in teachers])
+        teacher_workload = [{
+            'user_id': teacher.user_id,
+            'username': teacher.username,
+            'full_name': teacher.full_name,
+            'total_hours': workloads[teacher.user_id]['total_hours'],
+            'lessons_count': workloads[teacher.user_id]['lessons_count']
+        } for teacher in teachers]
+        
+        # Сортуємо по навантаженню
+        teacher_workload.sort(key=lambda x: x['total_hours'], reverse=True)
+        
+        # Загальна статистика (один GROUP BY level замість окремого COUNT на кожен рівень)
+        level_counts = dict(
+            session.query(Log.level, func.count(Log.id)).group_by(Log.level).all()
+        )
+        total_logs = sum(level_counts.values())
+        total_errors = level_counts.get('ERROR', 0)
+        total_warnings = level_counts.get('WARNING', 0)
+        total_security = level_counts.get('SECURITY', 0)
+        
+        general_stats = {
+            'total_logs': total_logs,
+            'total_errors': total_errors,
+            'total_warnings': total_warnings,
+            'total_security': total_security,
+            'total_info': total_logs - total_errors - total_warnings - total_security
+        }
+        
+        return {
+            'command_stats': command_stats,
+            'daily_activity': daily_activity,
+            'user_activity': user_activity,
+            'general_stats': general_stats,
+            'teacher_workload': teacher_workload
+        }
+
+
 @app.route('/stats')
 @admin_required
 def stats():
     """Статистика використання"""
     try:
-        with get_session() as session:
-            from sqlalchemy import func
-            
-            # Статистика по командах
-            command_stats = session.query(
-                Log.command,
-                func.count(Log.id).label('count')
-            ).filter(
-                Log.command.isnot(None)
-            ).group_by(Log.command).order_by(func.count(Log.id).desc()).limit(10).all()
-            
-            # Активність по днях (останні 30 днів)
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            daily_activity = session.query(
-                func.date(Log.timestamp).label('date'),
-                func.count(Log.id).label('count')
-            ).filter(
-                Log.timestamp >= thirty_days_ago
-            ).group_by(func.date(Log.timestamp)).order_by(func.date(Log.timestamp)).all()
-            
-            # Топ активних користувачів
-            top_users = session.query(
-                Log.user_id,
-                func.count(Log.id).label('activity_count')
-            ).filter(
-                Log.user_id.isnot(None),
-                Log.timestamp >= thirty_days_ago
-            ).group_by(Log.user_id).order_by(func.count(Log.id).desc()).limit(10).all()
-            
-            # Отримуємо дані користувачів
-            user_activity = []
-            for user_id, count in top_users:
-                user = session.query(User).filter(User.user_id == user_id).first()
-                user_activity.append({
-                    'user_id': user_id,
-                    'username': user.username if user else 'невідомий',
-                    'count': count
-                })
-            
-            # Навантаження викладачів
-            teachers = session.query(User).filter(User.role == 'user').all()
-            teacher_workload = []
-            for teacher in teachers:
-                workload = calculate_teacher_workload(session, teacher.user_id)
-                teacher_workload.append({
-                    'user_id': teacher.user_id,
-                    'username': teacher.username,
-                    'full_name': teacher.full_name,
-                    'total_hours': workload['total_hours'],
-                    'lessons_count': workload['lessons_count']
-                })
-            
-            # Сортуємо по навантаженню
-            teacher_workload.sort(key=lambda x: x['total_hours'], reverse=True)
-            
-            # Загальна статистика
-            total_logs = session.query(Log).count()
-            total_errors = session.query(Log).filter(Log.level == 'ERROR').count()
-            total_warnings = session.query(Log).filter(Log.level == 'WARNING').count()
-            total_security = session.query(Log).filter(Log.level == 'SECURITY').count()
-            
-            general_stats = {
-                'total_logs': total_logs,
-                'total_errors': total_errors,
-                'total_warnings': total_warnings,
-                'total_security': total_security,
-                'total_info': total_logs - total_errors - total_warnings - total_security
-            }
-            
-            return render_template('stats.html',
-                                 command_stats=command_stats,
-                                 daily_activity=daily_activity,
-                                 user_activity=user_activity,
-                                 general_stats=general_stats,
-                                 teacher_workload=teacher_workload)
+        today = date.today()
+        cached = _stats_cache.get(today)
+        if cached and (datetime.now() - cached[1]).total_seconds() < _STATS_CACHE_TTL:
+            stats_data = cached[0]
+        else:
+            stats_data = _load_stats_data()
+            _stats_cache.clear()
+            _stats_cache[today] = (stats_data, datetime.now())
+        
+        return render_template('stats.html', **stats_data)
     except Exception as e:
         flash(f'Помилка завантаження статистики: {e}', 'danger')
         return render_template('stats.html', command_stats=[], daily_activity=[], user_activity=[], general_stats={}, teacher_workload=[])
@@ -2686,175 +3169,129 @@ def schedule_report():
     """Монітор навчального процесу - дашборд з заняттями користувачів"""
     try:
         with get_session() as session:
-            # Отримуємо всіх користувачів (викладачів) - без фільтрів, показуємо всіх
-            teachers = session.query(User).filter(User.role == 'user').order_by(User.full_name, User.username).all()
-            
-            # Отримуємо всі групи (для відображення назв груп)
-            groups = session.query(Group).order_by(Group.name).all()
-            
-            # Мапінг днів тижня
-            day_names = {
-                'monday': 'Понеділок',
-                'tuesday': 'Вівторок',
-                'wednesday': 'Середа',
-                'thursday': 'Четвер',
-                'friday': 'П\'ятниця',
-                'saturday': 'Субота',
-                'sunday': 'Неділя'
-            }
-            days_order = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            
             # Визначаємо поточний день та час для фільтрації "зараз"
-            weekday_map = {
-                0: 'monday', 1: 'tuesday', 2: 'wednesday', 3: 'thursday',
-                4: 'friday', 5: 'saturday', 6: 'sunday'
-            }
-            current_day = weekday_map[datetime.now().weekday()]
+            # (DAYS_ORDER збігається з datetime.weekday(): 0 = понеділок)
+            current_day = DAYS_ORDER[datetime.now().weekday()]
             current_time = datetime.now().time()
             
             # Визначаємо поточний тип тижня
-            from schedule_handler import get_schedule_handler
-            schedule_handler = get_schedule_handler()
-            if schedule_handler:
-                current_week_type = schedule_handler.get_current_week_type()
-            else:
-                metadata_for_week = session.query(ScheduleMetadata).first()
-                if metadata_for_week and metadata_for_week.current_week in ["numerator", "denominator"]:
-                    current_week_type = metadata_for_week.current_week
-                else:
-                    current_week_type = 'numerator'
-            
-            # Для кожного користувача завантажуємо його заняття
-            users_data = []
+            current_week_type = _get_current_week_type(session)
+            
+            # Слоти часу, що проходять зараз: різних слотів за день лише кілька, тому
+            # розбираємо їх один раз і фільтруємо заняття в БД через time IN (...)
+            day_slots = session.query(ScheduleEntry.time).filter(
+                ScheduleEntry.day_of_week == current_day,
+                ScheduleEntry.week_type == current_week_type
+            ).distinct().all()
+            active_times = []
+            for (time_str,) in day_slots:
+                # Парсимо час заняття (формат "HH:MM-HH:MM"); якщо не вдалося - пропускаємо
+                slot = _parse_time_slot(time_str)
+                # Перевіряємо, чи поточний час знаходиться між початком та кінцем
+                if slot and slot[0] <= current_time <= slot[1]:
+                    active_times.append(time_str)
+            
+            # Всі викладачі (без фільтрів, показуємо всіх) з їх поточними заняттями та назвами груп
+            # одним запитом: LEFT JOIN залишає викладачів без занять рядком з NULL-полями заняття.
+            # Фільтр занять: тільки поточний день, поточний тип тижня та заняття, що проходять зараз
+            rows = session.query(
+                User.user_id, User.full_name, User.username,
+                ScheduleEntry.id, ScheduleEntry.time, ScheduleEntry.subject, ScheduleEntry.lesson_type,
+                ScheduleEntry.classroom, ScheduleEntry.conference_link, ScheduleEntry.group_id,
+                Group.name.label('group_name')
+            ).outerjoin(ScheduleEntry, and_(
+                ScheduleEntry.teacher_user_id == User.user_id,
+                ScheduleEntry.day_of_week == current_day,
+                ScheduleEntry.week_type == current_week_type,
+                ScheduleEntry.time.in_(active_times)
+            )).outerjoin(
+                Group, Group.id == ScheduleEntry.group_id
+            ).filter(
+                User.role == 'user'
+            ).order_by(User.full_name, User.username, User.user_id, ScheduleEntry.time).all()
+        
+        # Групуємо рядки по викладачу (рядки вже впорядковані SQL)
+        teachers = []
+        entries_by_teacher = {}
+        for teacher, teacher_rows in groupby(rows, key=lambda r: _TeacherOption(r.user_id, r.username, r.full_name)):
+            teachers.append(teacher)
+            teacher_entries = [row for row in teacher_rows if row.id is not None]
+            if teacher_entries:
+                entries_by_teacher[teacher.user_id] = teacher_entries
+        
+        def users_data():
+            """Дані викладачів по одному - шаблон рендериться потоково, без списку всіх блоків"""
             for teacher in teachers:
-                # Запит для заняття користувача
-                entries_query = session.query(ScheduleEntry).filter(
-                    ScheduleEntry.teacher_user_id == teacher.user_id
-                )
-                
-                # Фільтр: тільки поточний день та поточний тип тижня
-                entries_query = entries_query.filter(
-                    ScheduleEntry.day_of_week == current_day,
-                    ScheduleEntry.week_type == current_week_type
-                )
-                
-                entries = entries_query.order_by(ScheduleEntry.time).all()
-                
-                # Фільтруємо заняття по поточному часу (тільки ті, що зараз проходять)
-                current_entries = []
-                for entry in entries:
-                    try:
-                        # Парсимо час заняття (формат "HH:MM-HH:MM")
-                        if '-' in entry.time:
-                            start_str, end_str = entry.time.split('-')
-                            start_time = datetime.strptime(start_str.strip(), "%H:%M").time()
-                            end_time = datetime.strptime(end_str.strip(), "%H:%M").time()
-                            
-                            # Перевіряємо, чи поточний час знаходиться між початком та кінцем
-                            if start_time <= current_time <= end_time:
-                                current_entries.append(entry)
-                    except (ValueError, AttributeError):
-                        # Якщо не вдалося розпарсити час, пропускаємо
-                        continue
-                
-                entries = current_entries
-                
-                # Додаємо інформацію про групи до entries та парсимо час для прогресу
-                groups_dict = {g.id: g for g in groups}
-                for entry in entries:
-                    if entry.group_id and entry.group_id in groups_dict:
-                        entry.group_name = groups_dict[entry.group_id].name
-                    else:
-                        entry.group_name = None
-                    
-                    # Парсимо час для розрахунку прогресу
-                    if '-' in entry.time:
-                        try:
-                            start_str, end_str = entry.time.split('-')
-                            start_time = datetime.strptime(start_str.strip(), "%H:%M").time()
-                            end_time = datetime.strptime(end_str.strip(), "%H:%M").time()
-                            
-                            # Зберігаємо час початку та кінця як рядки для JavaScript
-                            entry.start_time_str = start_str.strip()
-                            entry.end_time_str = end_str.strip()
-                            
-                            # Розраховуємо тривалість в хвилинах
-                            start_datetime = datetime.combine(datetime.today(), start_time)
-                            end_datetime = datetime.combine(datetime.today(), end_time)
-                            if end_datetime < start_datetime:
-                                end_datetime += timedelta(days=1)
-                            duration_minutes = (end_datetime - start_datetime).total_seconds() / 60
-                            entry.duration_minutes = int(duration_minutes)
-                        except (ValueError, AttributeError):
-                            entry.start_time_str = None
-                            entry.end_time_str = None
-                            entry.duration_minutes = None
-                    else:
-                        entry.start_time_str = None
-                        entry.end_time_str = None
-                        entry.duration_minutes = None
+                # Легкі об'єкти з часом для прогресу замість ORM-екземплярів
+                entries = []
+                for row in entries_by_teacher.get(teacher.user_id, []):
+                    start_time_str, end_time_str, duration_minutes = _slot_progress(row.time)
+                    entries.append(SimpleNamespace(
+                        **row._asdict(),
+                        start_time_str=start_time_str,
+                        end_time_str=end_time_str,
+                        duration_minutes=duration_minutes
+                    ))
                 
                 # Групуємо заняття по днях та типу тижня (для поточного дня)
-                schedule_data = {}
-                for day in days_order:
-                    schedule_data[day] = {
-                        'numerator': [],
-                        'denominator': []
-                    }
+                schedule_data = _empty_schedule(DAYS_ORDER)
                 
-                # Додаємо заняття тільки для поточного дня
-                for entry in entries:
-                    if entry.day_of_week in schedule_data:
-                        schedule_data[entry.day_of_week][entry.week_type].append(entry)
+                # Заняття вже відфільтровані SQL за поточним днем і типом тижня,
+                # тому потрапляють в один слот без перевірок на кожне заняття
+                schedule_data[current_day][current_week_type].extend(entries)
                 
-                users_data.append({
+                yield {
                     'teacher': teacher,
                     'schedule': schedule_data,
                     'entries_count': len(entries)
-                })
-            
-            # Метадані для відображення
-            metadata = session.query(ScheduleMetadata).first()
-            
-            return render_template('schedule_report.html',
-                                 users_data=users_data,
-                                 teachers=teachers,
-                                 groups=groups,
-                                 day_names=day_names,
-                                 days_order=days_order,
-                                 metadata=metadata,
-                                 current_day=current_day,
-                                 current_week_type=current_week_type)
+                }
+        
+        # Flash-повідомлення забираємо з сесії до стрімінгу: cookie сесії відправляється
+        # із заголовками, тому зчитані під час рендеру повідомлення не видалились би.
+        # Зчитані тут кешуються в контексті запиту - base.html отримає їх звідти
+        get_flashed_messages()
+        
+        # Сесія БД вже закрита - далі лише рендер з підготовлених даних
+        return stream_template('schedule_report.html',
+                               users_data=users_data(),
+                               teachers=teachers,
+                               idle_teachers_count=len(teachers) - len(entries_by_teacher),
+                               day_names=DAY_NAMES_UK,
+                               days_order=DAYS_ORDER,
+                               current_day=current_day,
+                               current_week_type=current_week_type)
     except Exception as e:
         logger.log_error(f"Помилка завантаження звіту по розкладу: {e}")
         flash(f'Помилка завантаження звіту: {e}', 'danger')
         return render_template('schedule_report.html',
                              users_data=[],
                              teachers=[],
-                             groups=[],
+                             idle_teachers_count=0,
                              day_names={},
                              days_order=[],
-                             metadata=None,
                              current_day=None,
                              current_week_type=None)
 
 
 # Favicon handler (ігноруємо запити на favicon.ico)
 @app.route('/favicon.ico')
+@limiter.exempt
 def favicon():
     """Обробка запитів на favicon.ico"""
     return '', 204  # No Content
 
 
 # Error handlers
+# 404 для стандартних запитів браузерів, які не логуємо
+_IGNORE_404 = re.compile(r'/favicon\.ico|apple-touch-icon', re.IGNORECASE)
+
+
 @app.errorhandler(404)
 def not_found(error):
     """Обробка 404 помилок"""
     # Не логуємо 404 для favicon.ico та apple-touch-icon (стандартні запити браузерів)
-    url = request.url.lower()
-    if '/favicon.ico' not in url and 'apple-touch-icon' not in url:
-        if FLASK_ENV == 'production':
-            logger.log_warning(f"404 помилка: {request.url}")
+    if FLASK_ENV == 'production' and not _IGNORE_404.search(request.url):
+        logger.log_warning(f"404 помилка: {request.url}")
     return render_template('error.html', error_code=404, error_message='Сторінку не знайдено'), 404
 
 
@@ -2872,27 +3309,46 @@ def internal_error(error):
 @app.errorhandler(429)
 def ratelimit_handler(e):
     """Обробка rate limit помилок"""
-    logger.log_warning(f"Rate limit exceeded для IP {get_remote_address()}")
+    logger.log_warning(f"Rate limit exceeded для IP {get_remote_ip()}")
     return jsonify({'error': 'Занадто багато запитів. Спробуйте пізніше.'}), 429
 
 
+# Кеш відповіді /api/alert-status: {місто: (payload, час)}
+_alert_status_cache: Dict[str, tuple] = {}
+_ALERT_STATUS_CACHE_TTL = 5  # секунд
+
+# Event loop на потік воркера: створюється один раз і перевикористовується
+# (разом зі своїм default executor) замість нового loop на кожен запит
+_async_local = threading.local()
+
+
+def _run_async(coro):
+    """Виконання корутини на постійному event loop поточного потоку"""
+    loop = getattr(_async_local, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _async_local.loop = loop
+    return loop.run_until_complete(coro)
+
+
 @app.route('/api/alert-status')
 @csrf.exempt
 @limiter.limit("30 per minute")
 def api_alert_status():
     """API для отримання статусу повітряної тривоги з rate limiting"""
     try:
-        import asyncio
         air_alert_manager = get_air_alert_manager()
         
-        # Створюємо новий event loop для async виклику
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        alert_status = loop.run_until_complete(air_alert_manager.get_alert_status())
-        loop.close()
+        # Статус тривоги змінюється не частіше ніж раз на секунди - віддаємо з кешу
+        cached = _alert_status_cache.get(air_alert_manager.city)
+        if cached and (datetime.now() - cached[1]).total_seconds() < _ALERT_STATUS_CACHE_TTL:
+            return jsonify(cached[0])
+        
+        alert_status = _run_async(air_alert_manager.get_alert_status())
         
         if alert_status and air_alert_manager.active_alerts:
-            alert_types = set(alert.get('alert_type', 'unknown') for alert in air_alert_manager.active_alerts)
+            # Унікальні типи у порядку появи (детермінована відповідь, на відміну від set)
+            alert_types = dict.fromkeys(alert.get('alert_type', 'unknown') for alert in air_alert_manager.active_alerts)
             
             if 'air_raid' in alert_types:
                 message = f"ТРИВОГА в {air_alert_manager.city}!"
@@ -2901,18 +3357,21 @@ def api_alert_status():
             else:
                 message = f"ТРИВОГА в {air_alert_manager.city}!"
             
-            return jsonify({
+            payload = {
                 'alert': True,
                 'message': message,
                 'city': air_alert_manager.city,
                 'types': list(alert_types)
-            })
+            }
         else:
-            return jsonify({
+            payload = {
                 'alert': False,
                 'message': f"ТИХО в {air_alert_manager.city}",
                 'city': air_alert_manager.city
-            })
+            }
+        
+        _alert_status_cache[air_alert_manager.city] = (payload, datetime.now())
+        return jsonify(payload)
     except Exception as e:
         return jsonify({
             'alert': False,
@@ -2927,26 +3386,32 @@ def groups():
     """Управління групами"""
     try:
         with get_session() as session:
-            all_groups = session.query(Group).all()
-            teachers = session.query(User).filter(User.role == 'user').all()
+            # Тільки колонки, потрібні шаблону (рядки замість ORM-об'єктів)
+            all_groups = session.query(
+                Group.id, Group.name, Group.headman_name, Group.headman_phone,
+                Group.curator_user_id, Group.created_at, Group.updated_at
+            ).all()
+            teachers = session.query(User.user_id, User.full_name, User.username).filter(
+                User.role == 'user'
+            ).all()
+            
+            # Куратори всіх груп одним IN-запитом
+            curator_ids = {group.curator_user_id for group in all_groups if group.curator_user_id}
+            curators = {
+                curator.user_id: curator
+                for curator in session.query(User.user_id, User.full_name, User.username).filter(
+                    User.user_id.in_(curator_ids)
+                ).all()
+            } if curator_ids else {}
             
             # Додаємо інформацію про кураторів
             groups_data = []
             for group in all_groups:
-                curator = None
-                if group.curator_user_id:
-                    curator = session.query(User).filter(User.user_id == group.curator_user_id).first()
-                
-                groups_data.append({
-                    'id': group.id,
-                    'name': group.name,
-                    'headman_name': group.headman_name,
-                    'headman_phone': group.headman_phone,
-                    'curator_user_id': group.curator_user_id,
-                    'curator_display': curator.full_name if curator and curator.full_name else (curator.username if curator else 'Не встановлено'),
-                    'created_at': group.created_at,
-                    'updated_at': group.updated_at
-                })
+                curator = curators.get(group.curator_user_id)
+                groups_data.append(dict(
+                    group._asdict(),
+                    curator_display=curator.full_name if curator and curator.full_name else (curator.username if curator else 'Не встановлено')
+                ))
             
             return render_template('groups.html',
                                  groups=groups_data,
@@ -3053,17 +3518,39 @@ def delete_group(group_id):
 
 
 # PWA маршрути
+@lru_cache(maxsize=8)
+def _static_asset(rel_path: str) -> tuple:
+    """
+    Вміст статичного файлу та його ETag (читається з диску один раз на процес)
+    
+    Returns:
+        (bytes, etag)
+    """
+    with open(os.path.join(app.root_path, rel_path), 'rb') as f:
+        data = f.read()
+    return data, hashlib.sha1(data).hexdigest()
+
+
+def _send_static_asset(rel_path: str, mimetype: str) -> Response:
+    """Відповідь з закешованим вмістом файлу (з підтримкою 304 по ETag, як у send_file)"""
+    data, etag = _static_asset(rel_path)
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
 @app.route('/manifest.json')
 def manifest():
     """PWA Web App Manifest"""
-    return send_file('static/manifest.json', mimetype='application/manifest+json')
+    return _send_static_asset('static/manifest.json', 'application/manifest+json')
 
 
 @app.route('/sw.js')
 @csrf.exempt
 def service_worker():
     """Service Worker для PWA"""
-    response = send_file('static/js/sw.js', mimetype='application/javascript')
+    data, _ = _static_asset('static/js/sw.js')
+    response = Response(data, mimetype='application/javascript')
     # Дозволяємо service worker працювати на всіх сторінках
     response.headers['Service-Worker-Allowed'] = '/'
     # Відключаємо кешування для service worker (важливо для оновлень)
@@ -3080,7 +3567,10 @@ def service_worker():
 def apple_touch_icon():
     """Обробка запитів на apple-touch-icon для iOS (різні варіанти шляхів)"""
     try:
-        return send_file('static/icons/apple-touch-icon.png', mimetype='image/png')
+        response = _send_static_asset('static/icons/apple-touch-icon.png', 'image/png')
+        # Іконка змінюється лише з релізом - iOS може тримати її тиждень, далі перевірка по ETag
+        response.headers['Cache-Control'] = 'public, max-age=604800'
+        return response
     except FileNotFoundError:
         # Якщо файл не знайдено, повертаємо 404 без логування
         from flask import abort